@@ -21,8 +21,11 @@ from argon2 import PasswordHasher
 from flask import Blueprint, request, jsonify, Response
 from backend.database.db_connection import get_db
 from backend.auth_service.utils import create_token, verify_token_from_request
+from backend.common.responses import raw_json_response, STATUS_OK, STATUS_DELETED
+from backend.venues_service.queries import fetch_all_venues, current_venue_list_etag
 
 auth_bp = Blueprint("auth", __name__)
+logger = logging.getLogger(__name__)
 ph = PasswordHasher()
 
 
@@ -127,8 +130,12 @@ def login() -> Tuple[Response, int]:
     - email (str)
     - password (str)
 
+    The venue list is included so the event forms need not fetch it, with
+    the ETag to revalidate it against GET /venues/; both are omitted if the
+    list cannot be read.
+
     Returns:
-        200: JSON with user_id, role, and JWT token.
+        200: JSON with user_id, role, JWT token, venues and venues_etag.
         400: Missing credentials.
         401: Invalid credentials (wrong password or email).
         500: Database error.
@@ -160,12 +167,23 @@ def login() -> Tuple[Response, int]:
         return jsonify({"error": "Invalid credentials"}), 401
 
     token = create_token(user["user_id"], user["role"])
-
-    return jsonify({
+    body = {
         "user_id": user["user_id"],
         "role": user["role"],
         "token": token
-    }), 200
+    }
+
+    # Same pooled connection as the user lookup
+    try:
+        etag = current_venue_list_etag()
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                body["venues"] = fetch_all_venues(cur)
+        body["venues_etag"] = etag
+    except Exception:
+        logger.exception("Failed to prefetch venues for login")
+
+    return jsonify(body), 200
 
 
 # --- DELETE ACCOUNT ---
@@ -195,7 +213,7 @@ def delete_account() -> Union[Tuple[Response, int], Tuple[Dict[str, str], int]]:
     except Exception:
         return jsonify({"error": "Deletion failed"}), 500
 
-    return jsonify({"status": "deleted"}), 200
+    return raw_json_response(STATUS_DELETED), 200
 
 
 # --- GET CURRENT USER ---
@@ -235,7 +253,7 @@ def get_current_user() -> Tuple[Response, int]:
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    return jsonify(dict(user)), 200
+    return jsonify(user), 200
 
 
 # --- UPDATE CURRENT USER ---
@@ -296,7 +314,7 @@ def update_current_user() -> Tuple[Response, int]:
     except Exception:
         return jsonify({"error": "Update failed"}), 500
 
-    return jsonify(dict(updated_user)), 200
+    return jsonify(updated_user), 200
 
 
 # --- LIST USERS (ADMIN ONLY) ---
@@ -324,13 +342,13 @@ def list_users() -> Tuple[Response, int]:
         with get_db() as conn:
             with conn.cursor() as cur:
                 cur.execute(sql)
-                users = [dict(row) for row in cur.fetchall()]
+                users = cur.fetchall()
                 # Convert timestamps to ISO string for JSON serialization
                 for u in users:
                     if u.get('created_at'):
                         u['created_at'] = u['created_at'].isoformat()
-    except Exception as e:
-        print(f"Error listing users: {e}")
+    except Exception:
+        logger.exception("Failed to list users")
         return jsonify({"error": "Failed to retrieve users"}), 500
 
     return jsonify(users), 200
@@ -372,4 +390,4 @@ def set_role() -> Tuple[Response, int]:
     except Exception:
         return jsonify({"error": "Failed to update role"}), 500
 
-    return jsonify({"status": "ok"}), 200
\ No newline at end of file
+    return raw_json_response(STATUS_OK), 200
\ No newline at end of file
@@ -4,10 +4,12 @@ Provides token creation, verification, and role enforcement.
 """
 
 import os
+import time
 import jwt
 from datetime import datetime, timedelta, timezone
-from typing import Tuple, Optional, Any
-from flask import jsonify, request, Response
+from functools import lru_cache, wraps
+from typing import Callable, Tuple, Optional, Any
+from flask import g, jsonify, request, Response
 from dotenv import load_dotenv
 
 # Load .env only once here
@@ -44,10 +46,41 @@ def create_token(user_id: int, role: str) -> str:
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
 # --- JWT VALIDATION ---
+@lru_cache(maxsize=4096)
+def _decode(token: str, secret: str) -> Tuple[Optional[int], Optional[str], Optional[int]]:
+    """
+    Verify a JWT signature once and cache the claims we use.
+
+    Failed verifications raise and are therefore never cached.
+
+    Returns:
+        tuple: (user_id, role, exp)
+    """
+    payload = jwt.decode(token, secret, algorithms=["HS256"])
+    return payload.get("sub"), payload.get("role"), payload.get("exp")
+
+
+def _verify(token: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Return (user_id, role) for a token, re-checking expiry on cache hits.
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired.
+        jwt.InvalidTokenError: If the token is invalid.
+    """
+    user_id, role, exp = _decode(token, JWT_SECRET)
+    if exp is not None and exp <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return user_id, role
+
+
 def verify_token_from_request(required_roles: Optional[list] = None) -> Tuple[Optional[int], Optional[str], Optional[Response], Optional[int]]:
     """
     Verify the JWT in the Authorization header.
 
+    The verified (user_id, role) is remembered on flask.g, so later calls in
+    the same request skip verification; required_roles is checked every time.
+
     Args:
         required_roles (list, optional): List of allowed roles.
 
@@ -57,22 +90,24 @@ def verify_token_from_request(required_roles: Optional[list] = None) -> Tuple[Op
                If failed, user_id and role are None.
     """
 
-    auth = request.headers.get("Authorization", "")
+    if "auth" in g:
+        user_id, role = g.auth
+    else:
+        auth = request.headers.get("Authorization", "")
 
-    if not auth.startswith("Bearer "):
-        return None, None, jsonify({"error": "missing token"}), 401
+        if not auth.startswith("Bearer "):
+            return None, None, jsonify({"error": "missing token"}), 401
 
-    token = auth.split(" ", 1)[1]
+        token = auth.split(" ", 1)[1]
 
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
-        return None, None, jsonify({"error": "token expired"}), 401
-    except Exception:
-        return None, None, jsonify({"error": "invalid token"}), 401
+        try:
+            user_id, role = _verify(token)
+        except jwt.ExpiredSignatureError:
+            return None, None, jsonify({"error": "token expired"}), 401
+        except Exception:
+            return None, None, jsonify({"error": "invalid token"}), 401
 
-    user_id = payload.get("sub")
-    role = payload.get("role")
+        g.auth = (user_id, role)
 
     if required_roles and role not in required_roles:
         return None, None, jsonify({"error": "permission denied"}), 403
@@ -80,6 +115,30 @@ def verify_token_from_request(required_roles: Optional[list] = None) -> Tuple[Op
     return user_id, role, None, None
 
 
+def require_roles(*roles: str) -> Callable:
+    """
+    Route decorator: answer 401/403 unless the request carries a valid token
+    with one of the given roles (any role if none are given).
+
+    Verification goes through verify_token_from_request(), so the signature
+    check is cached per token and the caller is available as g.auth.
+
+    Usage:
+        @venues_bp.route("/", methods=["POST"])
+        @require_roles("admin")
+        def create_venue(): ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            _, _, err, code = verify_token_from_request(required_roles=roles or None)
+            if err:
+                return err, code
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def verify_token(token: str) -> Optional[int]:
     """
     Validate a JWT manually (optional usage).
@@ -91,7 +150,7 @@ def verify_token(token: str) -> Optional[int]:
         int: user_id if valid, None otherwise.
     """
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        return payload.get("sub")
+        user_id, _ = _verify(token)
+        return user_id
     except Exception:
         return None
@@ -0,0 +1,2 @@
+# backend/common/__init__.py
+# Marks this directory as a Python package.
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+In-process caching of encoded response bodies.
+Entries are tied to a data version (see db_connection.get_data_version), so
+any write to the underlying tables invalidates them without explicit purges.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class VersionedCache:
+    """
+    Maps a key (e.g. a query filter) to a body built at a given data version.
+
+    Holds at most max_entries keys; the least recently used one is evicted
+    first, so a burst of one-off keys cannot flush the entries in steady use.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        """
+        Return the cached body for key if it was built at this version.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, version: Any, body: Any) -> None:
+        """
+        Store body for key, evicting the least recently used entry if full.
+        """
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,122 @@
+"""
+Shared response helpers.
+Serializes JSON bodies with orjson instead of the stdlib encoder behind jsonify();
+OrjsonProvider does the same for jsonify() itself and request.get_json().
+"""
+
+import gzip
+import hashlib
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+def _default(obj: Any) -> Any:
+    """
+    Serialize types orjson does not support natively (e.g. Decimal from AVG()).
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode_json(obj: Any) -> bytes:
+    """
+    Encode obj to JSON bytes the same way json_response() does.
+    """
+    return orjson.dumps(obj, default=_default)
+
+
+def json_response(obj: Any) -> Response:
+    """
+    Drop-in replacement for jsonify() using orjson.
+
+    datetime values are written as ISO-8601 strings; naive values get no
+    offset, matching datetime.isoformat().
+
+    Args:
+        obj: Any JSON-serializable object (dicts, lists, datetimes, Decimals).
+
+    Returns:
+        Response: An application/json response.
+    """
+    return Response(encode_json(obj), mimetype="application/json")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson; install with app.json = OrjsonProvider(app).
+
+    Unlike the default provider, datetimes are written as ISO-8601 strings
+    (as json_response() does) and keys keep their query order.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return encode_json(obj).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj), mimetype=self.mimetype)
+
+
+# Constant bodies, encoded once at import time
+STATUS_OK = orjson.dumps({"status": "ok"})
+STATUS_UPDATED = orjson.dumps({"status": "updated"})
+STATUS_DELETED = orjson.dumps({"status": "deleted"})
+
+
+def raw_json_response(body: bytes) -> Response:
+    """
+    Wrap an already-encoded JSON body (e.g. STATUS_OK).
+
+    A new Response is still built per request: after_request hooks such as
+    Flask-CORS add headers to it, so a shared instance would leak them
+    between requests.
+    """
+    return Response(body, mimetype="application/json")
+
+
+def gzip_body(body: bytes, level: int = 6) -> bytes:
+    """
+    Compress an encoded JSON body for gzip_json_response().
+    """
+    return gzip.compress(body, compresslevel=level)
+
+
+def gzip_json_response(body: bytes) -> Response:
+    """
+    Wrap a body from gzip_body(); callers check Accept-Encoding first.
+    """
+    response = Response(body, mimetype="application/json")
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build an ETag value from everything a response depends on
+    (e.g. a data version, the caller and the request path).
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """
+    Attach a weak ETag and ask clients to revalidate before reusing the body.
+    """
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Empty 304 response for a client whose If-None-Match is still current.
+    """
+    return with_etag(Response(status=304), etag)
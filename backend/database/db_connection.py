@@ -1,47 +1,288 @@
 """
 PostgreSQL connection helper.
-Provides get_db() for use by services.
+Provides get_db() for use by services, plus helpers for running
+server-side prepared statements.
+
+Inside a Flask request, get_db() checks one connection per request out of a
+shared ThreadedConnectionPool; close_db(), which init_app() registers as a
+teardown handler, returns it to the pool.
 """
 
+import logging
 import os
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
 import psycopg2
-from psycopg2.extras import DictCursor
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
+from flask import Flask, g, has_app_context
 
 # Load .env variables from the project root
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Get the database URL from environment variable
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set. Please set the environment variable.")
 
-def get_db():
+class PreparingConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers which statements it has PREPAREd.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+        # time.monotonic() when opened and when last returned to the pool
+        self.opened_at = self.returned_at = time.monotonic()
+
+
+# Shared by direct connections and the pool
+CONNECT_KWARGS = {
+    "connection_factory": PreparingConnection,
+    # Return rows as real dictionaries (e.g., {"user_id": 1, "email": "..."}),
+    # built directly by psycopg2
+    "cursor_factory": RealDictCursor,
+    "application_name": "event-echo",
+}
+
+# Pool size, per process: how many requests of one gunicorn worker can use
+# the database at once; the rest wait for a free connection. psycopg2
+# closes a returned connection once POOL_MIN_CONN are idle, so both bounds
+# are the same: every connection stays open, together with the statements
+# PREPAREd on it.
+POOL_MAX_CONN = max(int(os.getenv("DB_POOL_SIZE", "8")), 2)
+POOL_MIN_CONN = POOL_MAX_CONN
+# Seconds a request waits for a free connection before giving up
+POOL_TIMEOUT = 30
+# Pooled connections older than this many seconds are replaced on checkout,
+# so server-side or firewall timeouts never hit a long-lived connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+if POOL_RECYCLE <= 0:
+    raise RuntimeError("DB_POOL_RECYCLE must be a positive number of seconds.")
+# Connections idle in the pool for longer than this are pinged before use
+POOL_PING_AFTER = 60
+
+# The pool is created on first use so importing this module never connects
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+# psycopg2 raises PoolError as soon as the pool is exhausted; this makes
+# extra requests wait for a connection to be returned instead
+_pool_slots = threading.BoundedSemaphore(POOL_MAX_CONN)
+
+
+def _connect() -> PreparingConnection:
+    """
+    Open a new psycopg2 connection with dictionary-based row access.
+
+    Raises:
+        psycopg2.Error: If connection fails.
     """
-    Returns a new psycopg2 connection with dictionary-based row access.
+    try:
+        # Connect to the PostgreSQL database
+        return psycopg2.connect(DATABASE_URL, **CONNECT_KWARGS)
+    except Exception as e:
+        print(f"Error connecting to database: {e}")
+        # Re-raise the exception so the caller knows the connection failed
+        raise
 
-    This utility ensures consistent connection parameters across services.
+
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    Raises:
+        psycopg2.Error: If the initial connections cannot be opened.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    POOL_MIN_CONN, POOL_MAX_CONN, DATABASE_URL, **CONNECT_KWARGS
+                )
+    return _pool
+
+
+def _is_usable(conn: PreparingConnection) -> bool:
+    """
+    Check a connection just taken from the pool.
+
+    Closed or too old connections are rejected without a round trip; only
+    connections that sat idle for more than POOL_PING_AFTER seconds are
+    pinged.
+    """
+    now = time.monotonic()
+    if conn.closed or now - conn.opened_at > POOL_RECYCLE:
+        return False
+    if now - conn.returned_at <= POOL_PING_AFTER:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _checkout() -> PreparingConnection:
+    """
+    Take a usable connection from the pool, discarding stale ones.
+
+    Every idle connection in the pool may be stale, so at most
+    POOL_MAX_CONN + 1 are tried before giving up.
+
+    Raises:
+        psycopg2.Error: If a replacement connection cannot be opened.
+        psycopg2.pool.PoolError: If no usable connection was found.
+    """
+    pool = get_pool()
+    for _ in range(POOL_MAX_CONN + 1):
+        conn = pool.getconn()
+        if _is_usable(conn):
+            return conn
+        pool.putconn(conn, close=True)
+    raise PoolError("No usable database connection")
+
+
+def get_db() -> PreparingConnection:
+    """
+    Returns the psycopg2 connection for the current request.
+
+    The connection is checked out of the pool on first use (waiting up to
+    POOL_TIMEOUT seconds if all DB_POOL_SIZE connections are busy, and
+    replacing connections that are closed, stale or fail a ping) and
+    reused by every later call in the same request, then returned at
+    teardown by close_db(). Outside of an app context (e.g. scripts) a new, unpooled
+    connection is returned and the caller is responsible for closing it.
     
     Usage:
         with get_db() as conn:
             with conn.cursor() as cur:
                 cur.execute(...)
+
+    The `with conn:` block is a transaction scope (commit on success,
+    rollback on error); it does not close the connection.
     
     Returns:
-        psycopg2.extensions.connection: A connection object with DictCursor factory.
+        psycopg2.extensions.connection: A connection object with RealDictCursor factory.
     
     Raises:
         psycopg2.Error: If connection fails.
+        psycopg2.pool.PoolError: If no pooled connection frees up in time.
+    """
+    if not has_app_context():
+        return _connect()
+
+    if "db" not in g:
+        if not _pool_slots.acquire(timeout=POOL_TIMEOUT):
+            raise PoolError("Timed out waiting for a database connection")
+        try:
+            g.db = _checkout()
+        except Exception:
+            _pool_slots.release()
+            raise
+    return g.db
+
+
+def close_db(exc: Optional[BaseException] = None) -> None:
+    """
+    Return the current request's connection to the pool, if one was taken.
+
+    The pool rolls back any open transaction; broken connections are discarded.
+    """
+    conn = g.pop("db", None)
+    if conn is not None:
+        conn.returned_at = time.monotonic()
+        try:
+            get_pool().putconn(conn, close=bool(conn.closed))
+        finally:
+            _pool_slots.release()
+
+
+def init_app(app: Flask) -> None:
+    """
+    Register close_db() so each request's connection is returned at teardown.
+    """
+    app.teardown_appcontext(close_db)
+
+
+# --- PREPARED STATEMENTS ---
+# Hot queries are registered once at import time (name -> SQL using $1..$n
+# placeholders) and PREPAREd lazily the first time each connection runs them,
+# so Postgres parses and plans them once per session instead of per request.
+PREPARED_STATEMENTS: Dict[str, str] = {}
+
+
+def register_statement(name: str, sql: str) -> None:
+    """
+    Register a statement that can later be run with execute_prepared().
+
+    Args:
+        name (str): Statement name (must be a valid SQL identifier).
+        sql (str): Statement text using $1..$n parameter placeholders.
+    """
+    PREPARED_STATEMENTS[name] = sql
+
+
+def execute_prepared(cur, name: str, params: Sequence = ()) -> None:
+    """
+    Execute a registered statement, preparing it on this connection if needed.
+
+    Args:
+        cur: A cursor from a connection returned by get_db().
+        name (str): Name passed to register_statement().
+        params (sequence): Values bound to $1..$n.
+    """
+    prepared = cur.connection.prepared
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} AS {PREPARED_STATEMENTS[name]};")
+        prepared.add(name)
+
+    if params:
+        cur.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))});", params)
+    else:
+        cur.execute(f"EXECUTE {name};")
+
+
+# --- DATA VERSIONS ---
+# Counters in the data_versions table are bumped by triggers whenever the
+# tables behind a cached resource change, so "has anything changed?" is a
+# primary-key lookup instead of re-running the real query.
+register_statement("data_version", "SELECT version FROM data_versions WHERE name = $1")
+
+# Counters that could not be read; later failures are only logged at debug
+_unreadable_versions = set()
+
+
+def get_data_version(name: str) -> Optional[int]:
+    """
+    Return the current change counter for a resource (e.g. 'events').
+
+    Args:
+        name (str): Row name in the data_versions table.
+
+    Returns:
+        int: The counter, or None if it could not be read (e.g. the
+        migration has not been applied); callers then skip caching.
     """
     try:
-        # Connect to the PostgreSQL database
-        conn = psycopg2.connect(DATABASE_URL)
-        
-        # Set the cursor factory to return rows as dictionaries 
-        # (e.g., {"user_id": 1, "email": "..."})
-        conn.cursor_factory = DictCursor
-        return conn
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        # Re-raise the exception so the caller knows the connection failed
-        raise
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                execute_prepared(cur, "data_version", (name,))
+                row = cur.fetchone()
+    except psycopg2.Error as e:
+        if name in _unreadable_versions:
+            logger.debug("Could not read data version '%s': %s", name, e)
+        else:
+            _unreadable_versions.add(name)
+            logger.warning("Could not read data version '%s'; responses will not be cached: %s", name, e)
+        return None
+    return row["version"] if row else None
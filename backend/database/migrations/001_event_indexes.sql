@@ -0,0 +1,19 @@
+-- === 001: Event aggregate and venue conflict indexes ===
+-- Apply to an existing database with:
+--   psql -d eventecho -f backend/database/migrations/001_event_indexes.sql
+
+-- Needed to mix an integer equality column into a GiST index
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- attendee_count subquery: rsvps of an event with status 'going'
+CREATE INDEX IF NOT EXISTS idx_rsvps_event_going ON public.rsvps USING btree (event_id) WHERE rsvp_status = 'going';
+
+-- avg_rating / review_count subqueries: index-only scan over (event_id, rating)
+CREATE INDEX IF NOT EXISTS idx_event_reviews_event_id_rating ON public.event_reviews USING btree (event_id) INCLUDE (rating);
+DROP INDEX IF EXISTS public.idx_event_reviews_event_id;
+
+-- Upcoming events by start time
+CREATE INDEX IF NOT EXISTS idx_events_upcoming_start ON public.events USING btree (start_time) WHERE status = 'upcoming';
+
+-- Venue conflict check: same venue AND overlapping time range
+CREATE INDEX IF NOT EXISTS idx_events_venue_period ON public.events USING gist (venue_id, tsrange(start_time, end_time)) WHERE status = 'upcoming';
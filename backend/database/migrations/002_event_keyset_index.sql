@@ -0,0 +1,6 @@
+-- === 002: Keyset pagination index for the events list ===
+-- Apply to an existing database with:
+--   psql -d eventecho -f backend/database/migrations/002_event_keyset_index.sql
+
+-- list_events pages with (start_time, event_id) > (cursor) ORDER BY start_time, event_id
+CREATE INDEX IF NOT EXISTS idx_events_start_time_event_id ON public.events USING btree (start_time, event_id);
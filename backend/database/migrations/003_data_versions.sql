@@ -0,0 +1,42 @@
+-- === 003: Data version counters for conditional GETs ===
+-- Apply to an existing database with:
+--   psql -d eventecho -f backend/database/migrations/003_data_versions.sql
+
+-- One counter per cached resource, bumped by statement-level triggers
+-- Trade-off: the UPDATE keeps the counter row locked until the writing
+-- transaction commits, so concurrent writes to the watched tables (e.g. two
+-- users' RSVPs) queue behind each other for that window. Routes commit right
+-- after their writes, which keeps the wait short. A sequence would avoid the
+-- lock, but nextval() is visible before the write commits, so a reader could
+-- cache the old rows under the new version.
+CREATE TABLE IF NOT EXISTS public.data_versions (
+	name varchar(50) NOT NULL,
+	version int8 DEFAULT 0 NOT NULL,
+	CONSTRAINT data_versions_pkey PRIMARY KEY (name)
+);
+INSERT INTO public.data_versions (name) VALUES ('events') ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.bump_data_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+	UPDATE public.data_versions SET version = version + 1 WHERE name = TG_ARGV[0];
+	RETURN NULL;
+END;
+$$;
+
+-- Everything the events list and review endpoints read from
+DROP TRIGGER IF EXISTS events_data_version ON public.events;
+CREATE TRIGGER events_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.events
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
+DROP TRIGGER IF EXISTS rsvps_data_version ON public.rsvps;
+CREATE TRIGGER rsvps_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.rsvps
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
+DROP TRIGGER IF EXISTS event_reviews_data_version ON public.event_reviews;
+CREATE TRIGGER event_reviews_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.event_reviews
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
+DROP TRIGGER IF EXISTS venues_data_version ON public.venues;
+CREATE TRIGGER venues_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.venues
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
+DROP TRIGGER IF EXISTS users_data_version ON public.users;
+CREATE TRIGGER users_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.users
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
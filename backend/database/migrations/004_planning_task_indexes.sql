@@ -0,0 +1,11 @@
+-- === 004: Planning board ordering indexes ===
+-- Apply to an existing database with:
+--   psql -d eventecho -f backend/database/migrations/004_planning_task_indexes.sql
+
+-- list_tasks?event_id=<id>: ORDER BY position, created_at DESC straight from the index
+CREATE INDEX IF NOT EXISTS idx_planning_event_position ON public.planning_tasks USING btree (event_id, "position", created_at DESC);
+-- Superseded by the index above (same leading column)
+DROP INDEX IF EXISTS public.idx_planning_event_id;
+
+-- list_tasks?event_id=global: tasks not linked to an event
+CREATE INDEX IF NOT EXISTS idx_planning_global_position ON public.planning_tasks USING btree ("position", created_at DESC) WHERE event_id IS NULL;
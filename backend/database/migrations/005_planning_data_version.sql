@@ -0,0 +1,26 @@
+-- === 005: Data version for the planning board ===
+-- Apply after 003 with:
+--   psql -d eventecho -f backend/database/migrations/005_planning_data_version.sql
+
+INSERT INTO public.data_versions (name) VALUES ('planning') ON CONFLICT DO NOTHING;
+
+-- A trigger may now bump several counters: one per trigger argument
+CREATE OR REPLACE FUNCTION public.bump_data_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+	UPDATE public.data_versions SET version = version + 1 WHERE name = ANY(TG_ARGV);
+	RETURN NULL;
+END;
+$$;
+
+-- list_tasks joins tasks with their assignee and event. events and users
+-- writes now lock both counter rows until commit (see 003).
+DROP TRIGGER IF EXISTS planning_tasks_data_version ON public.planning_tasks;
+CREATE TRIGGER planning_tasks_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.planning_tasks
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('planning');
+DROP TRIGGER IF EXISTS events_data_version ON public.events;
+CREATE TRIGGER events_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.events
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events', 'planning');
+DROP TRIGGER IF EXISTS users_data_version ON public.users;
+CREATE TRIGGER users_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.users
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events', 'planning');
@@ -0,0 +1,16 @@
+-- === 006: Keyset pagination for the planning board ===
+-- Apply after 004 with:
+--   psql -d eventecho -f backend/database/migrations/006_planning_task_keyset.sql
+
+-- The (position, task_id) row comparison skips NULL positions
+UPDATE public.planning_tasks SET "position" = 0 WHERE "position" IS NULL;
+ALTER TABLE public.planning_tasks ALTER COLUMN "position" SET NOT NULL;
+
+-- list_tasks pages through ORDER BY position, task_id straight from the index
+CREATE INDEX IF NOT EXISTS idx_planning_event_position_id ON public.planning_tasks USING btree (event_id, "position", task_id);
+CREATE INDEX IF NOT EXISTS idx_planning_global_position_id ON public.planning_tasks USING btree ("position", task_id) WHERE event_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_planning_position_id ON public.planning_tasks USING btree ("position", task_id);
+-- Superseded by the indexes above
+DROP INDEX IF EXISTS public.idx_planning_event_position;
+DROP INDEX IF EXISTS public.idx_planning_global_position;
+DROP INDEX IF EXISTS public.idx_planning_position;
@@ -0,0 +1,10 @@
+-- === 007: Data version for the venue list ===
+-- Apply after 005 with:
+--   psql -d eventecho -f backend/database/migrations/007_venue_data_version.sql
+
+INSERT INTO public.data_versions (name) VALUES ('venues') ON CONFLICT DO NOTHING;
+
+-- Venue names are also shown in the events list
+DROP TRIGGER IF EXISTS venues_data_version ON public.venues;
+CREATE TRIGGER venues_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.venues
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events', 'venues');
@@ -0,0 +1,8 @@
+-- === 008: Venue list index ===
+-- Apply to an existing database with:
+--   psql -d eventecho -f backend/database/migrations/008_venue_name_index.sql
+
+-- list_venues: ORDER BY name, venue_id and its (name, venue_id) keyset come
+-- straight from the index; the other columns are included so the small
+-- venues table can be read with an index-only scan
+CREATE INDEX IF NOT EXISTS idx_venues_name_id ON public.venues USING btree (name, venue_id) INCLUDE (building, room_number, google_maps_link);
@@ -1,3 +1,7 @@
+-- === Extensions ===
+-- btree_gist lets the venue conflict index combine venue_id with a time range.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
 -- === public.event_categories definition ===
 -- Drop table:
 -- DROP TABLE public.event_categories;
@@ -42,6 +46,7 @@ CREATE TABLE public.venues (
 	google_maps_link text NULL,
 	CONSTRAINT venues_pkey PRIMARY KEY (venue_id)
 );
+CREATE INDEX idx_venues_name_id ON public.venues USING btree (name, venue_id) INCLUDE (building, room_number, google_maps_link);
 
 -- === public.audit_log definition ===
 -- Drop table:
@@ -83,6 +88,9 @@ CREATE TABLE public.events (
 	CONSTRAINT events_organizer_id_fkey FOREIGN KEY (organizer_id) REFERENCES public.users(user_id) ON DELETE CASCADE,
 	CONSTRAINT events_venue_id_fkey FOREIGN KEY (venue_id) REFERENCES public.venues(venue_id) ON DELETE SET NULL
 );
+CREATE INDEX idx_events_upcoming_start ON public.events USING btree (start_time) WHERE status = 'upcoming';
+CREATE INDEX idx_events_venue_period ON public.events USING gist (venue_id, tsrange(start_time, end_time)) WHERE status = 'upcoming';
+CREATE INDEX idx_events_start_time_event_id ON public.events USING btree (start_time, event_id);
 
 -- === public.planning_tasks definition ===
 -- Drop table:
@@ -100,14 +108,15 @@ CREATE TABLE public.planning_tasks (
 	created_by int4 NULL,
 	created_at timestamp DEFAULT CURRENT_TIMESTAMP NULL,
 	updated_at timestamp DEFAULT CURRENT_TIMESTAMP NULL,
-	"position" float8 DEFAULT 0 NULL,
+	"position" float8 DEFAULT 0 NOT NULL,
 	CONSTRAINT planning_tasks_pkey PRIMARY KEY (task_id),
 	CONSTRAINT planning_tasks_assigned_to_fkey FOREIGN KEY (assigned_to) REFERENCES public.users(user_id) ON DELETE SET NULL,
 	CONSTRAINT planning_tasks_created_by_fkey FOREIGN KEY (created_by) REFERENCES public.users(user_id) ON DELETE SET NULL,
 	CONSTRAINT planning_tasks_event_id_fkey FOREIGN KEY (event_id) REFERENCES public.events(event_id) ON DELETE CASCADE
 );
-CREATE INDEX idx_planning_event_id ON public.planning_tasks USING btree (event_id);
-CREATE INDEX idx_planning_position ON public.planning_tasks USING btree ("position");
+CREATE INDEX idx_planning_event_position_id ON public.planning_tasks USING btree (event_id, "position", task_id);
+CREATE INDEX idx_planning_global_position_id ON public.planning_tasks USING btree ("position", task_id) WHERE event_id IS NULL;
+CREATE INDEX idx_planning_position_id ON public.planning_tasks USING btree ("position", task_id);
 
 -- === public.rsvps definition ===
 -- Drop table:
@@ -121,6 +130,7 @@ CREATE TABLE public.rsvps (
 	CONSTRAINT rsvps_event_id_fkey FOREIGN KEY (event_id) REFERENCES public.events(event_id) ON DELETE CASCADE,
 	CONSTRAINT rsvps_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(user_id) ON DELETE CASCADE
 );
+CREATE INDEX idx_rsvps_event_going ON public.rsvps USING btree (event_id) WHERE rsvp_status = 'going';
 
 -- === public.event_category_map definition ===
 -- Drop table:
@@ -150,4 +160,43 @@ CREATE TABLE public.event_reviews (
 	CONSTRAINT event_reviews_event_id_fkey FOREIGN KEY (event_id) REFERENCES public.events(event_id) ON DELETE CASCADE,
 	CONSTRAINT event_reviews_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(user_id) ON DELETE CASCADE
 );
-CREATE INDEX idx_event_reviews_event_id ON public.event_reviews USING btree (event_id);
\ No newline at end of file
+CREATE INDEX idx_event_reviews_event_id_rating ON public.event_reviews USING btree (event_id) INCLUDE (rating);
+
+-- === public.data_versions definition ===
+-- Drop table:
+-- DROP TABLE public.data_versions;
+
+-- One counter per cached resource, bumped by statement-level triggers
+-- Trade-off: the UPDATE keeps the counter row locked until the writing
+-- transaction commits, so concurrent writes to the watched tables (e.g. two
+-- users' RSVPs) queue behind each other for that window. Routes commit right
+-- after their writes, which keeps the wait short. A sequence would avoid the
+-- lock, but nextval() is visible before the write commits, so a reader could
+-- cache the old rows under the new version.
+CREATE TABLE public.data_versions (
+	name varchar(50) NOT NULL,
+	version int8 DEFAULT 0 NOT NULL,
+	CONSTRAINT data_versions_pkey PRIMARY KEY (name)
+);
+INSERT INTO public.data_versions (name) VALUES ('events'), ('planning'), ('venues');
+
+CREATE OR REPLACE FUNCTION public.bump_data_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+	UPDATE public.data_versions SET version = version + 1 WHERE name = ANY(TG_ARGV);
+	RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER events_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.events
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events', 'planning');
+CREATE TRIGGER rsvps_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.rsvps
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
+CREATE TRIGGER event_reviews_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.event_reviews
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events');
+CREATE TRIGGER venues_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.venues
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events', 'venues');
+CREATE TRIGGER users_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.users
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('events', 'planning');
+CREATE TRIGGER planning_tasks_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.planning_tasks
+	FOR EACH STATEMENT EXECUTE FUNCTION public.bump_data_version('planning');
@@ -3,25 +3,162 @@ Events service routes: create, read, update, delete events, and RSVP.
 Handles event lifecycle management and participation.
 """
 
+import logging
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Tuple, Dict, Any, Optional
 
-from flask import Blueprint, request, jsonify, Response
+import ciso8601
+from flask import Blueprint, request, Response
 from dotenv import load_dotenv
 
-from backend.database.db_connection import get_db
+from backend.database.db_connection import get_db, register_statement, execute_prepared, get_data_version
 from backend.auth_service.utils import verify_token_from_request, verify_token
+from backend.common.responses import (
+    json_response, raw_json_response, make_etag, with_etag, not_modified,
+    STATUS_UPDATED, STATUS_DELETED,
+)
 
 load_dotenv()
 
 events_bp = Blueprint("events", __name__)
+logger = logging.getLogger(__name__)
 
 # --- CONSTANTS FOR VALIDATION ---
 TITLE_MAX_LENGTH = 200
-VALID_VISIBILITY = ['public', 'private']
-VALID_LOCATION_TYPES = ['venue', 'custom']
-VALID_STATUSES = ['upcoming', 'cancelled', 'completed'] 
+VALID_VISIBILITY = frozenset({'public', 'private'})
+VALID_LOCATION_TYPES = frozenset({'venue', 'custom'})
+VALID_STATUSES = frozenset({'upcoming', 'cancelled', 'completed'})
+VALID_RSVP_STATUSES = frozenset({'going', 'maybe', 'canceled'})
+PRIVILEGED_ROLES = frozenset({'admin', 'organizer'})
+
+# Validation error bodies, built once instead of per request
+ERR_VISIBILITY = {"error": "visibility must be one of: public, private"}
+ERR_LOCATION_TYPE = {"error": "location_type must be one of: venue, custom"}
+ERR_STATUS = {"error": "status must be one of: upcoming, cancelled, completed"}
+
+# --- PAGINATION ---
+# Pagination is opt-in: without ?limit= or a cursor the full list is returned.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# --- PREPARED STATEMENTS ---
+# Complex Query Explanation (list_events):
+# 1. Joins events with venues and users (organizers).
+# 2. Left join on rsvps to check if the current user has RSVP'd.
+# 3. Subqueries calculate attendee counts and review stats per event.
+# 4. Timestamps are formatted and ratings cast in SQL so the rows can be
+#    aggregated straight into a JSON array by Postgres; the ::text cast stops
+#    psycopg2 from decoding it back into Python objects.
+# 5. Keyset pagination on (start_time, event_id): a NULL cursor starts from
+#    the beginning and a NULL limit means LIMIT ALL.
+LIST_EVENTS_SQL = """
+    SELECT COALESCE(json_agg(t ORDER BY t.start_time, t.event_id), '[]'::json)::text AS events_json
+    FROM (
+        SELECT 
+            e.event_id, e.title, e.description, 
+            to_char(e.start_time, 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS start_time,
+            to_char(e.end_time, 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS end_time,
+            e.location_type, e.custom_location_address, e.google_maps_link,
+            e.status, e.visibility, e.organizer_id, e.created_by,
+            v.name AS venue_name, v.building AS venue_building, v.room_number AS venue_room,
+            u.first_name AS organizer_first_name, u.last_name AS organizer_last_name,
+            r.rsvp_status AS my_rsvp_status,
+            e.venue_id,
+            (SELECT COUNT(*) FROM rsvps WHERE rsvps.event_id = e.event_id AND rsvps.rsvp_status = 'going') as attendee_count,
+            
+            (SELECT AVG(rating)::float8 FROM event_reviews WHERE event_reviews.event_id = e.event_id) as avg_rating,
+            (SELECT COUNT(*) FROM event_reviews WHERE event_reviews.event_id = e.event_id) as review_count
+
+        FROM events e
+        LEFT JOIN venues v ON e.venue_id = v.venue_id
+        LEFT JOIN users u ON e.organizer_id = u.user_id
+        LEFT JOIN rsvps r ON e.event_id = r.event_id AND r.user_id = {user}
+        WHERE {visibility}
+          AND (e.start_time, e.event_id) > (COALESCE({after_time}, '-infinity'::timestamp), COALESCE({after_id}, 0))
+        ORDER BY e.start_time, e.event_id
+        LIMIT {limit}
+    ) t
+"""
+
+# Logged in: public events OR the user's own private events
+register_statement("list_events_auth", LIST_EVENTS_SQL.format(
+    user="$1",
+    visibility="(e.visibility = 'public' OR e.organizer_id = $1 OR e.created_by = $1)",
+    after_time="$2", after_id="$3", limit="$4",
+))
+# Anonymous: only public events
+register_statement("list_events_anon", LIST_EVENTS_SQL.format(
+    user="NULL",
+    visibility="e.visibility = 'public'",
+    after_time="$1", after_id="$2", limit="$3",
+))
+
+register_statement("get_event", """
+    SELECT 
+        e.event_id, e.title, e.description, 
+        to_char(e.start_time, 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS start_time,
+        to_char(e.end_time, 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS end_time,
+        e.location_type, e.custom_location_address, e.google_maps_link,
+        e.status, e.visibility, e.organizer_id, e.created_by, e.venue_id,
+        v.name AS venue_name,
+        (SELECT COUNT(*) FROM rsvps WHERE rsvps.event_id = e.event_id AND rsvps.rsvp_status = 'going') as attendee_count,
+        
+        (SELECT AVG(rating)::float8 FROM event_reviews WHERE event_reviews.event_id = e.event_id) as avg_rating,
+        (SELECT COUNT(*) FROM event_reviews WHERE event_reviews.event_id = e.event_id) as review_count
+
+    FROM events e
+    LEFT JOIN venues v ON e.venue_id = v.venue_id
+    WHERE e.event_id = $1
+""")
+
+# Upsert: Insert or Update
+register_statement("rsvp_upsert", """
+    INSERT INTO rsvps (user_id, event_id, rsvp_status) 
+    VALUES ($1, $2, $3)
+    ON CONFLICT (user_id, event_id) 
+    DO UPDATE SET rsvp_status = EXCLUDED.rsvp_status
+""")
+
+register_statement("rsvp_delete", """
+    DELETE FROM rsvps WHERE user_id = $1 AND event_id = $2
+""")
+
+# Review created_at is a timestamp without time zone holding the session's
+# local time (CURRENT_TIMESTAMP); the cast to timestamptz reads it in that
+# zone so it can be sent in UTC with a "Z", like the event times
+register_statement("review_upsert", """
+    INSERT INTO event_reviews (event_id, user_id, rating, review_text)
+    VALUES ($1, $2, $3, $4)
+    ON CONFLICT (user_id, event_id)
+    DO UPDATE SET
+        rating = EXCLUDED.rating,
+        review_text = EXCLUDED.review_text,
+        created_at = CURRENT_TIMESTAMP
+    RETURNING review_id, event_id, user_id, rating, review_text,
+        to_char(created_at::timestamptz AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS created_at
+""")
+
+# --- UPDATE STATEMENT ---
+UPDATABLE_EVENT_FIELDS = [
+    "title", "description", "start_time", "end_time", 
+    "location_type", "venue_id", "custom_location_address", 
+    "google_maps_link", "visibility", "status"
+]
+
+# Each column keeps its current value unless its set_<field> flag is true.
+# Non-privileged users only match rows they created.
+UPDATE_EVENT_SQL = (
+    "UPDATE events SET "
+    + ", ".join(
+        f"{key} = CASE WHEN %(set_{key})s THEN %({key})s ELSE {key} END"
+        for key in UPDATABLE_EVENT_FIELDS
+    )
+    + """, updated_at = CURRENT_TIMESTAMP
+    WHERE event_id = %(event_id)s AND (%(is_privileged)s OR created_by = %(user_id)s)
+    RETURNING start_time, end_time, location_type, venue_id, custom_location_address;"""
+)
+
 
 def parse_dt(val: Optional[str]) -> Optional[datetime]:
     """
@@ -37,12 +174,56 @@ def parse_dt(val: Optional[str]) -> Optional[datetime]:
         return None
     try:
         # Handles 'YYYY-MM-DDTHH:MM' and '...Z' or '...+00:00'
-        if val.endswith('Z'):
-            val = val[:-1] + '+00:00'
-        return datetime.fromisoformat(val)
+        return ciso8601.parse_datetime(val)
     except (ValueError, TypeError):
         return None
-    
+
+
+def parse_page_args(with_time: bool) -> Tuple[Optional[datetime], Optional[int], Optional[int]]:
+    """
+    Read keyset pagination arguments from the query string.
+
+    Args:
+        with_time (bool): Whether the cursor also includes ?after_time=.
+
+    Returns:
+        tuple: (after_time, after_id, limit). All None when the client did
+        not ask for pagination; after_time is naive UTC to match the columns.
+
+    Raises:
+        ValueError: If an argument is malformed or the cursor is incomplete.
+    """
+    args = request.args
+    after_id = int(args["after_id"]) if "after_id" in args else None
+
+    after_time = None
+    if with_time:
+        if ("after_time" in args) != (after_id is not None):
+            raise ValueError("after_time and after_id must be given together")
+        if "after_time" in args:
+            after_time = parse_dt(args["after_time"])
+            if after_time is None:
+                raise ValueError("Invalid after_time")
+            if after_time.tzinfo is not None:
+                after_time = after_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if "limit" in args:
+        limit = min(max(int(args["limit"]), 1), MAX_PAGE_SIZE)
+    elif after_id is not None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        limit = None
+
+    return after_time, after_id, limit
+
+
+def is_one_of(value: Any, valid: frozenset) -> bool:
+    """
+    Membership test for request values; lists or objects sent in the JSON
+    body are simply invalid rather than an unhashable-type error.
+    """
+    return isinstance(value, str) and value in valid
+
 
 @events_bp.route("/", methods=["GET"])
 def list_events() -> Tuple[Response, int]:
@@ -53,77 +234,52 @@ def list_events() -> Tuple[Response, int]:
     - If logged in: Returns public events + user's private events.
     - If anonymous: Returns only public events.
     - Includes aggregate data: attendee_count, avg_rating, review_count.
+    - Optional paging: ?limit=N, then ?after_time=&after_id= taken from the
+      last event of the previous page.
+    - Supports If-None-Match: the ETag changes whenever event data does.
     
     Returns:
-        200: List of event objects.
+        200: List of event objects, ordered by start_time then event_id.
+        304: Not modified since the client's ETag.
+        400: Invalid pagination parameters.
         500: Database error.
     """
+    try:
+        after_time, after_id, limit = parse_page_args(with_time=True)
+    except ValueError:
+        return json_response({"error": "Invalid pagination parameters"}), 400
+
     auth_user_id = None
     auth = request.headers.get("Authorization", "")
     if auth.startswith("Bearer "):
         token = auth.split(" ", 1)[1]
         auth_user_id = verify_token(token)
 
-    # Complex Query Explanation:
-    # 1. Joins events with venues and users (organizers).
-    # 2. Left join on rsvps to check if the current user has RSVP'd.
-    # 3. Subqueries calculate attendee counts and review stats per event.
-    base_sql = """
-        SELECT 
-            e.event_id, e.title, e.description, 
-            e.start_time AT TIME ZONE 'UTC' as start_time, 
-            e.end_time AT TIME ZONE 'UTC' as end_time,
-            e.location_type, e.custom_location_address, e.google_maps_link,
-            e.status, e.visibility, e.organizer_id, e.created_by,
-            v.name AS venue_name, v.building AS venue_building, v.room_number AS venue_room,
-            u.first_name AS organizer_first_name, u.last_name AS organizer_last_name,
-            r.rsvp_status AS my_rsvp_status,
-            e.venue_id,
-            (SELECT COUNT(*) FROM rsvps WHERE rsvps.event_id = e.event_id AND rsvps.rsvp_status = 'going') as attendee_count,
-            
-            (SELECT AVG(rating) FROM event_reviews WHERE event_reviews.event_id = e.event_id) as avg_rating,
-            (SELECT COUNT(*) FROM event_reviews WHERE event_reviews.event_id = e.event_id) as review_count
-
-        FROM events e
-        LEFT JOIN venues v ON e.venue_id = v.venue_id
-        LEFT JOIN users u ON e.organizer_id = u.user_id
-        LEFT JOIN rsvps r ON e.event_id = r.event_id AND r.user_id = %s
-        WHERE 1=1
-    """
-    
-    params = [auth_user_id] 
-    
     if auth_user_id:
-        # User is logged in: show public events OR their own private events
-        base_sql += "AND (e.visibility = 'public' OR e.organizer_id = %s OR e.created_by = %s)"
-        params.extend([auth_user_id, auth_user_id])
+        statement, params = "list_events_auth", (auth_user_id, after_time, after_id, limit)
     else:
-        # Not logged in: show only public events
-        base_sql += "AND e.visibility = 'public'"
+        statement, params = "list_events_anon", (after_time, after_id, limit)
 
-    base_sql += " ORDER BY e.start_time;"
+    # Skip the query entirely if the client already has this version
+    version = get_data_version("events")
+    etag = make_etag(version, auth_user_id, request.full_path)
+    if version is not None and request.if_none_match.contains_weak(etag):
+        return not_modified(etag), 304
 
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(base_sql, params)
-                rows = [dict(r) for r in cur.fetchall()]
-                
-                # Explicitly ensure ISO format strings for JSON serialization
-                for row in rows:
-                    if row.get('start_time'):
-                        row['start_time'] = row['start_time'].isoformat()
-                    if row.get('end_time'):
-                        row['end_time'] = row['end_time'].isoformat()
-                    # Convert decimal rating to float
-                    if row.get('avg_rating'):
-                        row['avg_rating'] = float(row['avg_rating'])
+                execute_prepared(cur, statement, params)
+                events_json = cur.fetchone()["events_json"]
 
-    except Exception as e:
-        print(f"Database error listing events: {e}")
-        return jsonify({"error": "Failed to retrieve events"}), 500
-        
-    return jsonify(rows), 200
+    except Exception:
+        logger.exception("Failed to list events")
+        return json_response({"error": "Failed to retrieve events"}), 500
+
+    response = Response(events_json, mimetype="application/json")
+    if version is not None:
+        with_etag(response, etag)
+    return response, 200
 
 
 @events_bp.route("/<int:event_id>", methods=["GET"])
@@ -146,54 +302,26 @@ def get_event(event_id: int) -> Tuple[Response, int]:
         token = auth.split(" ", 1)[1]
         auth_user_id = verify_token(token)
 
-    sql = """
-        SELECT 
-            e.event_id, e.title, e.description, 
-            e.start_time AT TIME ZONE 'UTC' as start_time,
-            e.end_time AT TIME ZONE 'UTC' as end_time,
-            e.location_type, e.custom_location_address, e.google_maps_link,
-            e.status, e.visibility, e.organizer_id, e.created_by, e.venue_id,
-            v.name AS venue_name,
-            (SELECT COUNT(*) FROM rsvps WHERE rsvps.event_id = e.event_id AND rsvps.rsvp_status = 'going') as attendee_count,
-            
-            (SELECT AVG(rating) FROM event_reviews WHERE event_reviews.event_id = e.event_id) as avg_rating,
-            (SELECT COUNT(*) FROM event_reviews WHERE event_reviews.event_id = e.event_id) as review_count
-
-        FROM events e
-        LEFT JOIN venues v ON e.venue_id = v.venue_id
-        WHERE e.event_id = %s
-    """
-    
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, (event_id,))
+                execute_prepared(cur, "get_event", (event_id,))
                 event = cur.fetchone()
-                
-                if not event:
-                    return jsonify({"error": "Event not found"}), 404
+    except Exception:
+        logger.exception("Failed to get event %s", event_id)
+        return json_response({"error": "Failed to retrieve event"}), 500
 
-                # Privacy Check
-                is_public = event['visibility'] == 'public'
-                is_owner = auth_user_id and (event['organizer_id'] == auth_user_id or event['created_by'] == auth_user_id)
-                
-                if not is_public and not is_owner:
-                    return jsonify({"error": "Permission denied"}), 403
-
-                # Convert to dict and ensure datetime ISO format
-                event_dict = dict(event)
-                if event_dict.get('start_time'):
-                    event_dict['start_time'] = event_dict['start_time'].isoformat()
-                if event_dict.get('end_time'):
-                    event_dict['end_time'] = event_dict['end_time'].isoformat()
-                
-                if event_dict.get('avg_rating'):
-                    event_dict['avg_rating'] = float(event_dict['avg_rating'])
+    if not event:
+        return json_response({"error": "Event not found"}), 404
 
-                return jsonify(event_dict), 200
-    except Exception as e:
-        print(f"Database error getting event: {e}")
-        return jsonify({"error": "Failed to retrieve event"}), 500
+    # Privacy Check
+    is_public = event['visibility'] == 'public'
+    is_owner = auth_user_id and (event['organizer_id'] == auth_user_id or event['created_by'] == auth_user_id)
+
+    if not is_public and not is_owner:
+        return json_response({"error": "Permission denied"}), 403
+
+    return json_response(event), 200
 
 @events_bp.route("/", methods=["POST"])
 def create_event() -> Tuple[Response, int]:
@@ -225,98 +353,96 @@ def create_event() -> Tuple[Response, int]:
     
     # --- START VALIDATION ---
     if not title or not start_str or not end_str:
-        return jsonify({"error": "title, start_time, and end_time are required"}), 400
+        return json_response({"error": "title, start_time, and end_time are required"}), 400
 
     if len(title) > TITLE_MAX_LENGTH:
-        return jsonify({"error": f"Title must be {TITLE_MAX_LENGTH} characters or less."}), 400
+        return json_response({"error": f"Title must be {TITLE_MAX_LENGTH} characters or less."}), 400
     # --- END VALIDATION ---
 
     start_dt = parse_dt(start_str)
     end_dt = parse_dt(end_str)
     
     if not start_dt or not end_dt:
-        return jsonify({"error": "Invalid datetime format. Use ISO-8601."}), 400
+        return json_response({"error": "Invalid datetime format. Use ISO-8601."}), 400
         
     if start_dt >= end_dt:
-        return jsonify({"error": "start_time must be before end_time"}), 400
+        return json_response({"error": "start_time must be before end_time"}), 400
 
     location_type = data.get("location_type", "custom")
     venue_id = data.get("venue_id")
     custom_location = data.get("custom_location_address")
     
     # --- START VALIDATION ---
-    if location_type not in VALID_LOCATION_TYPES:
-         return jsonify({"error": f"location_type must be one of: {', '.join(VALID_LOCATION_TYPES)}"}), 400
+    if not is_one_of(location_type, VALID_LOCATION_TYPES):
+         return json_response(ERR_LOCATION_TYPE), 400
     
     if location_type == 'venue' and not venue_id:
-        return jsonify({"error": "venue_id is required for location_type 'venue'"}), 400
+        return json_response({"error": "venue_id is required for location_type 'venue'"}), 400
     if location_type == 'custom' and not custom_location:
-        return jsonify({"error": "custom_location_address is required for location_type 'custom'"}), 400
+        return json_response({"error": "custom_location_address is required for location_type 'custom'"}), 400
     # --- END VALIDATION ---
 
     description = data.get("description")
     google_maps_link = data.get("google_maps_link")
     visibility = data.get("visibility", "public")
     
-    if visibility not in VALID_VISIBILITY:
+    if not is_one_of(visibility, VALID_VISIBILITY):
         visibility = 'public'
 
-    if visibility == 'public' and role not in ['organizer', 'admin']:
-        return jsonify({
+    if visibility == 'public' and role not in PRIVILEGED_ROLES:
+        return json_response({
             "error": "Permission denied. Only organizers and admins can create public events."
         }), 403
 
-    # Check for scheduling conflicts at the venue
-    if location_type == 'venue':
-        conflict_sql = """
-            SELECT event_id FROM events
-            WHERE venue_id = %s
-            AND status = 'upcoming'
-            AND (start_time, end_time) OVERLAPS (%s, %s);
-        """
-        try:
-            with get_db() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(conflict_sql, (venue_id, start_dt, end_dt))
-                    conflict = cur.fetchone()
-                    if conflict:
-                        return jsonify({"error": "Scheduling conflict detected at this venue"}), 409
-        except Exception as e:
-            print(f"Database error during conflict check: {e}")
-            return jsonify({"error": "Failed to check for conflicts"}), 500
-
+    # Insert only if the venue is free. The conflict check runs in the same
+    # statement as the INSERT (one round-trip instead of two). For custom
+    # locations venue_id is NULL, which never matches, so the CTE is empty.
     sql = """
+        WITH conflict AS (
+            SELECT 1 FROM events
+            WHERE venue_id = %(venue_id)s
+            AND status = 'upcoming'
+            AND tsrange(start_time, end_time) && tsrange(%(start_time)s::timestamp, %(end_time)s::timestamp)
+        )
         INSERT INTO events (
             title, description, start_time, end_time, 
             location_type, venue_id, custom_location_address, google_maps_link,
             visibility, organizer_id, created_by, status
-        ) VALUES (
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s, 'upcoming'
         )
+        SELECT
+            %(title)s, %(description)s, %(start_time)s, %(end_time)s,
+            %(location_type)s, %(venue_id)s, %(custom_location_address)s, %(google_maps_link)s,
+            %(visibility)s, %(user_id)s, %(user_id)s, 'upcoming'
+        WHERE NOT EXISTS (SELECT 1 FROM conflict)
         RETURNING event_id;
     """
     
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, (
-                    title, description, start_dt, end_dt,
-                    location_type, 
-                    venue_id if location_type == 'venue' else None,
-                    custom_location if location_type == 'custom' else None,
-                    google_maps_link,
-                    visibility, user_id, user_id
-                ))
+                cur.execute(sql, {
+                    "title": title,
+                    "description": description,
+                    "start_time": start_dt,
+                    "end_time": end_dt,
+                    "location_type": location_type,
+                    "venue_id": venue_id if location_type == 'venue' else None,
+                    "custom_location_address": custom_location if location_type == 'custom' else None,
+                    "google_maps_link": google_maps_link,
+                    "visibility": visibility,
+                    "user_id": user_id,
+                })
                 new_event = cur.fetchone()
                 conn.commit()
-                event_id = new_event["event_id"]
-    except Exception as e:
-        print(f"Database error creating event: {e}")
-        return jsonify({"error": "Failed to create event"}), 500
+    except Exception:
+        logger.exception("Failed to create event")
+        return json_response({"error": "Failed to create event"}), 500
 
-    return jsonify({"event_id": event_id}), 201
+    if not new_event:
+        return json_response({"error": "Scheduling conflict detected at this venue"}), 409
+
+    event_id = new_event["event_id"]
+    return json_response({"event_id": event_id}), 201
 
 
 @events_bp.route("/<int:event_id>", methods=["PUT"])
@@ -328,10 +454,15 @@ def update_event(event_id: int) -> Tuple[Response, int]:
     - Admin or Organizer
     - OR the creator of the event
 
+    The UPDATE runs as a single statement; checks that depend on the
+    resulting row (time order, location consistency) are made on the
+    RETURNING values and the transaction is rolled back if they fail.
+
     Returns:
         200: Status updated.
         400: Validation error.
         403: Forbidden.
+        404: Event not found.
     """
     user_id, role, err, code = verify_token_from_request()
     if err:
@@ -339,138 +470,98 @@ def update_event(event_id: int) -> Tuple[Response, int]:
 
     data: Dict[str, Any] = request.get_json() or {}
     if not data:
-        return jsonify({"error": "No update data provided"}), 400
-        
-    conn = get_db()
-    try:
-        # --- FETCH CURRENT EVENT STATE FIRST FOR VALIDATION ---
-        with conn.cursor() as cur:
-            # Fetch all fields needed for validation
-            cur.execute(
-                """
-                SELECT organizer_id, created_by, start_time, end_time, 
-                       location_type, venue_id, custom_location_address, visibility
-                FROM events 
-                WHERE event_id = %s;
-                """, 
-                (event_id,)
-            )
-            ev = cur.fetchone()
-            if not ev:
-                conn.close()
-                return jsonify({"error": "Event not found"}), 404
-
-            # --- PERMISSION CHECKS ---
-            if role not in ['admin', 'organizer'] and ev["created_by"] != user_id:
-                conn.close()
-                return jsonify({"error": "Permission denied"}), 403
-            
-            if 'visibility' in data and data['visibility'] == 'public':
-                if role not in ['admin', 'organizer']:
-                    conn.close()
-                    return jsonify({"error": "Only organizers/admins can make events public"}), 403
+        return json_response({"error": "No update data provided"}), 400
 
-        # --- VALIDATION BLOCK ---
-        
-        if "title" in data:
-            title = data.get("title")
-            if not title:
-                return jsonify({"error": "Title cannot be empty"}), 400
-            if len(title) > TITLE_MAX_LENGTH:
-                return jsonify({"error": f"Title must be {TITLE_MAX_LENGTH} characters or less."}), 400
-
-        # --- DATETIME VALIDATION ---
-        start_dt = parse_dt(data.get("start_time")) if "start_time" in data else None
-        end_dt = parse_dt(data.get("end_time")) if "end_time" in data else None
-
-        if "start_time" in data and not start_dt:
-            return jsonify({"error": "Invalid start_time format. Use ISO-8601."}), 400
-        if "end_time" in data and not end_dt:
-            return jsonify({"error": "Invalid end_time format. Use ISO-8601."}), 400
-
-        # Check final start/end times
-        final_start = start_dt or ev['start_time']
-        final_end = end_dt or ev['end_time']
-
-        if final_start >= final_end:
-            return jsonify({"error": "start_time must be before end_time"}), 400
-        
-        # --- ENUM VALIDATIONS ---
-        if "visibility" in data and data.get("visibility") not in VALID_VISIBILITY:
-             return jsonify({"error": f"visibility must be one of: {', '.join(VALID_VISIBILITY)}"}), 400
-
-        if "status" in data and data.get("status") not in VALID_STATUSES:
-             return jsonify({"error": f"status must be one of: {', '.join(VALID_STATUSES)}"}), 400
-
-        if "location_type" in data and data.get("location_type") not in VALID_LOCATION_TYPES:
-             return jsonify({"error": f"location_type must be one of: {', '.join(VALID_LOCATION_TYPES)}"}), 400
-             
-        # --- LOCATION LOGIC VALIDATION ---
-        # Determine the *final* state of the event
-        final_loc_type = data.get("location_type", ev['location_type'])
-        final_venue_id = data.get("venue_id", ev['venue_id'])
-        final_custom_loc = data.get("custom_location_address", ev['custom_location_address'])
-
-        # Auto-set logic
-        if "venue_id" in data and "location_type" not in data:
-            final_loc_type = 'venue'
-        if "custom_location_address" in data and "location_type" not in data:
-            final_loc_type = 'custom'
-
-        if final_loc_type == 'venue' and not final_venue_id:
-            return jsonify({"error": "venue_id is required for location_type 'venue'"}), 400
-        
-        if final_loc_type == 'custom' and not final_custom_loc:
-            return jsonify({"error": "custom_location_address is required for location_type 'custom'"}), 400
+    is_privileged = role in PRIVILEGED_ROLES
 
-        fields = []
-        values = []
-        
-        allowed_fields = [
-            "title", "description", "start_time", "end_time", 
-            "location_type", "venue_id", "custom_location_address", 
-            "google_maps_link", "visibility", "status"
-        ]
-        
-        for key in allowed_fields:
-            if key in data:
-                fields.append(f"{key} = %s")
-                if key in ("start_time", "end_time"):
-                    values.append(parse_dt(data[key]))
-                else:
-                    values.append(data[key])
-        
-        # Auto-update location_type if needed
-        if "venue_id" in data and "location_type" not in data:
-             fields.append("location_type = 'venue'")
-        elif "custom_location_address" in data and "location_type" not in data:
-             fields.append("location_type = 'custom'")
-
-        if "updated_at" not in fields:
-             fields.append("updated_at = CURRENT_TIMESTAMP")
-
-        if fields:
-            values.append(event_id)
-            sql = f"UPDATE events SET {', '.join(fields)} WHERE event_id = %s;"
-            
+    if not any(key in data for key in UPDATABLE_EVENT_FIELDS):
+        return json_response({"error": "No valid fields to update"}), 400
+
+    if 'visibility' in data and data['visibility'] == 'public':
+        if not is_privileged:
+            return json_response({"error": "Only organizers/admins can make events public"}), 403
+
+    # --- VALIDATION BLOCK ---
+    
+    if "title" in data:
+        title = data.get("title")
+        if not title:
+            return json_response({"error": "Title cannot be empty"}), 400
+        if len(title) > TITLE_MAX_LENGTH:
+            return json_response({"error": f"Title must be {TITLE_MAX_LENGTH} characters or less."}), 400
+
+    # --- DATETIME VALIDATION ---
+    # Parse each provided time once; the values are reused for the UPDATE.
+    parsed = {key: parse_dt(data[key]) for key in ("start_time", "end_time") if key in data}
+
+    for key, value in parsed.items():
+        if not value:
+            return json_response({"error": f"Invalid {key} format. Use ISO-8601."}), 400
+
+    # --- ENUM VALIDATIONS ---
+    if "visibility" in data and not is_one_of(data.get("visibility"), VALID_VISIBILITY):
+         return json_response(ERR_VISIBILITY), 400
+
+    if "status" in data and not is_one_of(data.get("status"), VALID_STATUSES):
+         return json_response(ERR_STATUS), 400
+
+    if "location_type" in data and not is_one_of(data.get("location_type"), VALID_LOCATION_TYPES):
+         return json_response(ERR_LOCATION_TYPE), 400
+
+    # Every field gets a fixed pair of parameters: a flag saying whether it
+    # was provided and the new value, so the SQL text never changes.
+    params: Dict[str, Any] = {
+        "event_id": event_id,
+        "user_id": user_id,
+        "is_privileged": is_privileged,
+    }
+    for key in UPDATABLE_EVENT_FIELDS:
+        params[f"set_{key}"] = key in data
+        params[key] = parsed[key] if key in parsed else data.get(key)
+
+    # Auto-update location_type if needed
+    if "location_type" not in data:
+        if "venue_id" in data:
+            params["set_location_type"], params["location_type"] = True, 'venue'
+        elif "custom_location_address" in data:
+            params["set_location_type"], params["location_type"] = True, 'custom'
+
+    try:
+        with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, values)
+                cur.execute(UPDATE_EVENT_SQL, params)
+                ev = cur.fetchone()
+
+                if not ev:
+                    # Nothing updated: tell "missing" apart from "not yours"
+                    cur.execute("SELECT 1 FROM events WHERE event_id = %s;", (event_id,))
+                    if cur.fetchone():
+                        return json_response({"error": "Permission denied"}), 403
+                    return json_response({"error": "Event not found"}), 404
+
+                # --- VALIDATE THE RESULTING ROW ---
+                error = None
+                if ev['start_time'] >= ev['end_time']:
+                    error = "start_time must be before end_time"
+                elif ev['location_type'] == 'venue' and not ev['venue_id']:
+                    error = "venue_id is required for location_type 'venue'"
+                elif ev['location_type'] == 'custom' and not ev['custom_location_address']:
+                    error = "custom_location_address is required for location_type 'custom'"
+
+                if error:
+                    conn.rollback()
+                    return json_response({"error": error}), 400
+
                 conn.commit()
-        else:
-            return jsonify({"error": "No valid fields to update"}), 400
 
     except Exception as e:
-        conn.rollback()
-        print(f"Database error updating event {event_id}: {e}")
+        logger.exception("Failed to update event %s", event_id)
         # Specific PG error catching could go here
         if "value too long for type character varying" in str(e):
-             return jsonify({"error": "A value provided was too long for the database."}), 400
-        return jsonify({"error": "Failed to update event"}), 500
-    finally:
-        if conn:
-            conn.close()
+             return json_response({"error": "A value provided was too long for the database."}), 400
+        return json_response({"error": "Failed to update event"}), 500
 
-    return jsonify({"status": "updated"}), 200
+    return raw_json_response(STATUS_UPDATED), 200
 
 
 @events_bp.route("/<int:event_id>", methods=["DELETE"])
@@ -485,25 +576,27 @@ def delete_event(event_id: int) -> Tuple[Response, int]:
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT organizer_id, created_by FROM events WHERE event_id = %s;", (event_id,))
-                ev = cur.fetchone()
-                if not ev:
-                    return jsonify({"error": "Event not found"}), 404
-
-                if role not in ['admin', 'organizer'] and ev["created_by"] != user_id:
-                    return jsonify({"error": "Permission denied"}), 403
+                # Non-privileged users only match rows they created
+                cur.execute("""
+                    DELETE FROM events
+                    WHERE event_id = %s AND (%s OR created_by = %s)
+                    RETURNING event_id;
+                """, (event_id, role in PRIVILEGED_ROLES, user_id))
+
+                if not cur.fetchone():
+                    # Nothing deleted: tell "missing" apart from "not yours"
+                    cur.execute("SELECT 1 FROM events WHERE event_id = %s;", (event_id,))
+                    if cur.fetchone():
+                        return json_response({"error": "Permission denied"}), 403
+                    return json_response({"error": "Event not found"}), 404
 
-                cur.execute("DELETE FROM events WHERE event_id = %s;", (event_id,))
                 conn.commit()
-                
-                if cur.rowcount == 0:
-                    return jsonify({"error": "Event not found or already deleted"}), 404
                     
-    except Exception as e:
-        print(f"Database error deleting event {event_id}: {e}")
-        return jsonify({"error": "Failed to delete event"}), 500
+    except Exception:
+        logger.exception("Failed to delete event %s", event_id)
+        return json_response({"error": "Failed to delete event"}), 500
 
-    return jsonify({"status": "deleted"}), 200
+    return raw_json_response(STATUS_DELETED), 200
 
 
 @events_bp.route("/<int:event_id>/rsvp", methods=["POST"])
@@ -521,76 +614,89 @@ def rsvp(event_id: int) -> Tuple[Response, int]:
     data: Dict[str, Any] = request.get_json() or {}
     status = data.get("status")
     
-    sql = ""
-    params = []
-
     if status:
-        if status not in ["going", "maybe", "canceled"]:
-            return jsonify({"error": "Invalid status"}), 400
-        
-        # Upsert: Insert or Update
-        sql = """
-            INSERT INTO rsvps (user_id, event_id, rsvp_status) 
-            VALUES (%s, %s, %s)
-            ON CONFLICT (user_id, event_id) 
-            DO UPDATE SET rsvp_status = EXCLUDED.rsvp_status;
-        """
-        params = (user_id, event_id, status)
+        if not is_one_of(status, VALID_RSVP_STATUSES):
+            return json_response({"error": "Invalid status"}), 400
+        statement, params = "rsvp_upsert", (user_id, event_id, status)
     else:
         # If no status, treat as removal
-        sql = "DELETE FROM rsvps WHERE user_id = %s AND event_id = %s;"
-        params = (user_id, event_id)
+        statement, params = "rsvp_delete", (user_id, event_id)
 
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, params)
+                execute_prepared(cur, statement, params)
                 conn.commit()
-    except Exception as e:
-        print(f"Database error RSVPing: {e}")
-        return jsonify({"error": "Failed to RSVP"}), 500
+    except Exception:
+        logger.exception("Failed to RSVP to event %s", event_id)
+        return json_response({"error": "Failed to RSVP"}), 500
 
-    return jsonify({"status": status or "cleared"}), 200
+    return json_response({"status": status or "cleared"}), 200
 
 
 @events_bp.route("/<int:event_id>/rsvps", methods=["GET"])
 def get_rsvps(event_id: int) -> Tuple[Response, int]:
     """
-    Get the list of attendees for an event.
+    Get the list of attendees for an event, ordered by user_id.
     Restricted to Organizers and Admins (or the event creator).
+    Optional paging: ?limit=N, then ?after_id= set to the last user_id seen.
     """
     user_id, role, err, code = verify_token_from_request()
     if err:
         return err, code
 
+    try:
+        _, after_id, limit = parse_page_args(with_time=False)
+    except ValueError:
+        return json_response({"error": "Invalid pagination parameters"}), 400
+
+    # The permission check rides along as an EXISTS, so an allowed caller
+    # gets the attendees in one round trip
     sql = """
         SELECT u.user_id, u.first_name, u.last_name, u.email, r.rsvp_status
         FROM rsvps r
         JOIN users u ON r.user_id = u.user_id
-        WHERE r.event_id = %s AND r.rsvp_status IN ('going', 'maybe');
+        WHERE r.event_id = %(event_id)s AND r.rsvp_status IN ('going', 'maybe')
+          AND r.user_id > COALESCE(%(after_id)s, 0)
+          AND EXISTS (
+              SELECT 1 FROM events e
+              WHERE e.event_id = %(event_id)s
+              AND (%(is_privileged)s OR e.organizer_id = %(user_id)s OR e.created_by = %(user_id)s)
+          )
+        ORDER BY r.user_id
+        LIMIT %(limit)s;
     """
+    params = {
+        "event_id": event_id,
+        "after_id": after_id,
+        "limit": limit,
+        "user_id": user_id,
+        "is_privileged": role in PRIVILEGED_ROLES,
+    }
     
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT organizer_id, created_by FROM events WHERE event_id = %s;", (event_id,))
-                event = cur.fetchone()
-                
-                if not event:
-                    return jsonify({"error": "Event not found"}), 404
-                
-                is_creator = (event["organizer_id"] == user_id) or (event["created_by"] == user_id)
-                if role not in ['admin', 'organizer'] and not is_creator:
-                    return jsonify({"error": "Permission denied"}), 403
+                cur.execute(sql, params)
+                attendees = cur.fetchall()
 
-                cur.execute(sql, (event_id,))
-                attendees = [dict(row) for row in cur.fetchall()]
+                if not attendees:
+                    # Empty page: tell "no attendees" apart from "missing" / "not yours"
+                    cur.execute("SELECT organizer_id, created_by FROM events WHERE event_id = %s;", (event_id,))
+                    event = cur.fetchone()
+
+                    if not event:
+                        return json_response({"error": "Event not found"}), 404
+
+                    is_creator = (event["organizer_id"] == user_id) or (event["created_by"] == user_id)
+                    if role not in PRIVILEGED_ROLES and not is_creator:
+                        return json_response({"error": "Permission denied"}), 403
                 
-    except Exception as e:
-        print(f"Database error getting RSVPs: {e}")
-        return jsonify({"error": "Failed to retrieve attendee list"}), 500
+    except Exception:
+        logger.exception("Failed to get RSVPs for event %s", event_id)
+        return json_response({"error": "Failed to retrieve attendee list"}), 500
 
-    return jsonify(attendees), 200
+    return json_response(attendees), 200
 
 
 @events_bp.route("/users/<int:user_id>/profile", methods=["GET"])
@@ -613,13 +719,13 @@ def get_user_profile(user_id: int) -> Tuple[Response, int]:
             with conn.cursor() as cur:
                 cur.execute(sql, (user_id,))
                 profile = cur.fetchone()
-                if not profile:
-                    return jsonify({"error": "User not found"}), 404
-                return jsonify(dict(profile)), 200
-                
-    except Exception as e:
-        print(f"Database error getting profile: {e}")
-        return jsonify({"error": "Failed to retrieve profile"}), 500
+    except Exception:
+        logger.exception("Failed to get profile for user %s", user_id)
+        return json_response({"error": "Failed to retrieve profile"}), 500
+
+    if not profile:
+        return json_response({"error": "User not found"}), 404
+    return json_response(profile), 200
     
 # --- REVIEWS ENDPOINTS ---
 
@@ -627,11 +733,17 @@ def get_user_profile(user_id: int) -> Tuple[Response, int]:
 def get_event_reviews(event_id: int) -> Tuple[Response, int]:
     """
     Get all reviews for a specific event.
+    Supports If-None-Match: the ETag changes whenever event data does.
     """
-    
+    version = get_data_version("events")
+    etag = make_etag(version, request.full_path)
+    if version is not None and request.if_none_match.contains_weak(etag):
+        return not_modified(etag), 304
+
     sql = """
         SELECT 
-            r.review_id, r.user_id, r.rating, r.review_text, r.created_at,
+            r.review_id, r.user_id, r.rating, r.review_text,
+            to_char(r.created_at::timestamptz AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS created_at,
             u.first_name, u.last_name
         FROM event_reviews r
         JOIN users u ON r.user_id = u.user_id
@@ -643,17 +755,15 @@ def get_event_reviews(event_id: int) -> Tuple[Response, int]:
         with get_db() as conn:
             with conn.cursor() as cur:
                 cur.execute(sql, (event_id,))
-                reviews = [dict(row) for row in cur.fetchall()]
-                
-                # Ensure ISO format for datetimes
-                for review in reviews:
-                    if review.get('created_at'):
-                        review['created_at'] = review['created_at'].isoformat()
-                        
-                return jsonify(reviews), 200
-    except Exception as e:
-        print(f"Database error getting reviews: {e}")
-        return jsonify({"error": "Failed to retrieve reviews"}), 500
+                reviews = cur.fetchall()
+    except Exception:
+        logger.exception("Failed to get reviews for event %s", event_id)
+        return json_response({"error": "Failed to retrieve reviews"}), 500
+
+    response = json_response(reviews)
+    if version is not None:
+        with_etag(response, etag)
+    return response, 200
 
 
 @events_bp.route("/<int:event_id>/review", methods=["POST"])
@@ -671,30 +781,16 @@ def post_event_review(event_id: int) -> Tuple[Response, int]:
     review_text = data.get("review_text")
 
     if not rating or not isinstance(rating, int) or not (1 <= rating <= 5):
-        return jsonify({"error": "A rating between 1 and 5 is required"}), 400
+        return json_response({"error": "A rating between 1 and 5 is required"}), 400
 
-    sql = """
-        INSERT INTO event_reviews (event_id, user_id, rating, review_text)
-        VALUES (%s, %s, %s, %s)
-        ON CONFLICT (user_id, event_id)
-        DO UPDATE SET
-            rating = EXCLUDED.rating,
-            review_text = EXCLUDED.review_text,
-            created_at = CURRENT_TIMESTAMP
-        RETURNING *;
-    """
-    
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, (event_id, user_id, rating, review_text))
-                new_review = dict(cur.fetchone())
+                execute_prepared(cur, "review_upsert", (event_id, user_id, rating, review_text))
+                new_review = cur.fetchone()
                 conn.commit()
-                
-                if new_review.get('created_at'):
-                    new_review['created_at'] = new_review['created_at'].isoformat()
+    except Exception:
+        logger.exception("Failed to post review for event %s", event_id)
+        return json_response({"error": "Failed to post review"}), 500
 
-                return jsonify(new_review), 201
-    except Exception as e:
-        print(f"Database error posting review: {e}")
-        return jsonify({"error": "Failed to post review"}), 500
\ No newline at end of file
+    return json_response(new_review), 201
\ No newline at end of file
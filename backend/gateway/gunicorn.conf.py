@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for production.
+Run with: gunicorn -c backend/gateway/gunicorn.conf.py backend.gateway.wsgi:app
+
+Workers are gevent-based by default: while a request waits on Postgres or
+an AI provider, the worker serves other requests. Database use per worker is
+still capped by DB_POOL_SIZE (see db_connection.py); requests beyond that
+wait for a pooled connection. Set GUNICORN_WORKER_CLASS=gthread to use
+threads instead.
+"""
+
+import os
+
+bind = os.getenv("GATEWAY_BIND", "127.0.0.1:5050")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+# Concurrent requests per gevent worker
+worker_connections = 1000
+# Threads per gthread worker
+threads = 8
+
+
+def post_fork(server, worker):
+    """
+    Make psycopg2 yield to other greenlets while it waits on the network,
+    before the worker opens any database connection.
+    """
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -3,19 +3,56 @@ API gateway: combines auth, events, and venues blueprints.
 This is the local entrypoint for development.
 """
 
-from flask import Flask, jsonify
+from flask import Flask
 from flask_cors import CORS
 import os
+import atexit
 import logging
-import sys
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Run from the project root (python -m backend.gateway.server, or gunicorn
+# backend.gateway.wsgi:app) so the backend package is importable
+from backend.auth_service.routes import auth_bp
+from backend.events_service.routes import events_bp
+from backend.venues_service.routes import venues_bp
+from backend.ai_service.routes import ai_blueprint
+from backend.planning_service.routes import planning_bp
+from backend.database import db_connection
+from backend.common.responses import OrjsonProvider, encode_json, raw_json_response, STATUS_OK
+
 print("DEBUG_DATABASE_URL:", os.getenv("DATABASE_URL")) # For database URL debugging
 
-# Basic console logging during API requests
-logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(asctime)s - %(message)s")
+def configure_logging() -> None:
+    """
+    Console logging during API requests.
+
+    Request threads only put records on a queue; a background listener
+    thread writes them to stderr, so handlers never block on the stream.
+    """
+    root = logging.getLogger()
+    if any(isinstance(h, QueueHandler) for h in root.handlers):
+        return
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("[%(levelname)s] %(asctime)s - %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    listener = QueueListener(log_queue, console)
+    listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(listener.stop)
+
+configure_logging()
+
+# The root check body never changes, so it is encoded once (like STATUS_OK)
+GATEWAY_OK = encode_json({"status": "gateway_ok"})
 
 def create_app() -> Flask:
     """
@@ -25,6 +62,8 @@ def create_app() -> Flask:
         Flask: The configured Flask application.
     """
     app = Flask(__name__)
+    # jsonify() and request.get_json() go through orjson
+    app.json = OrjsonProvider(app)
     # Configure CORS for S3 bucket
     # For local development include common dev origins (add more as needed)
     CORS(app, resources={
@@ -37,35 +76,24 @@ def create_app() -> Flask:
                 "null"  # For local file testing
             ],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "expose_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": True
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match"],
+            "expose_headers": ["Content-Type", "Authorization", "ETag"],
+            "supports_credentials": True,
+            # Let browsers cache preflight results (Chrome caps this at 2 hours)
+            "max_age": 86400
         }
     })
 
-    # Add the project root to Python path
-    # This allows imports like 'from backend.auth_service.routes import auth_bp'
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-    
     # --- REGISTER BLUEPRINTS ---
-    try:
-        from backend.auth_service.routes import auth_bp
-        from backend.events_service.routes import events_bp
-        from backend.venues_service.routes import venues_bp
-        from backend.ai_service.routes import ai_blueprint
-        from backend.planning_service.routes import planning_bp
-
-        app.register_blueprint(auth_bp, url_prefix="/auth")
-        app.register_blueprint(events_bp, url_prefix="/events")
-        app.register_blueprint(venues_bp, url_prefix="/venues")
-        app.register_blueprint(ai_blueprint, url_prefix="/ai")
-        app.register_blueprint(planning_bp, url_prefix='/planning')
-        
-        logging.info("All blueprints registered successfully.")
-
-    except ImportError as e:
-        logging.error(f"Failed to import blueprints. Module not found: {e}")
-        sys.exit(1)
+    db_connection.init_app(app)
+
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(events_bp, url_prefix="/events")
+    app.register_blueprint(venues_bp, url_prefix="/venues")
+    app.register_blueprint(ai_blueprint, url_prefix="/ai")
+    app.register_blueprint(planning_bp, url_prefix='/planning')
+    
+    logging.info("All blueprints registered successfully.")
 
     # --- BASIC HEALTH CHECKPOINTS ---
     @app.route("/")
@@ -73,14 +101,15 @@ def create_app() -> Flask:
         """
         Root URL for simple 'online' check.
         """
-        return jsonify({"status": "gateway_ok"}), 200
+        return raw_json_response(GATEWAY_OK), 200
 
-    @app.route("/health")
+    @app.route("/health", strict_slashes=False)
     def health():
         """
-        Health check endpoint.
+        Health check endpoint. Also answers /health/ directly, so probes
+        configured with a trailing slash are not redirected first.
         """
-        return jsonify({"status": "ok"}), 200
+        return raw_json_response(STATUS_OK), 200
     
     return app
 
@@ -0,0 +1,8 @@
+"""
+WSGI entrypoint for production servers.
+Run with: gunicorn -c backend/gateway/gunicorn.conf.py backend.gateway.wsgi:app
+"""
+
+from backend.gateway.server import create_app
+
+app = create_app()
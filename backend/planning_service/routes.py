@@ -4,13 +4,99 @@ Supports organizers in managing event logistics.
 """
 
 import datetime
+import logging
+from functools import lru_cache
 from typing import Tuple, Dict, Any, Optional
 
-from flask import Blueprint, request, jsonify, Response
-from backend.database.db_connection import get_db
+import ciso8601
+from flask import Blueprint, g, request, jsonify, Response
+from psycopg2.extras import execute_values
+from backend.database.db_connection import get_db, get_data_version, register_statement, execute_prepared
 from backend.auth_service.utils import verify_token_from_request
+from backend.common.cache import VersionedCache
+from backend.common.responses import (
+    encode_json, raw_json_response, make_etag, with_etag, not_modified,
+    STATUS_UPDATED,
+)
 
 planning_bp = Blueprint("planning", __name__)
+logger = logging.getLogger(__name__)
+
+# Roles allowed to use any planning route
+PLANNING_ROLES = frozenset({'admin', 'organizer'})
+
+# Encoded first pages of list_tasks per event filter and limit, valid for
+# one 'planning' data version; later pages are always read from the database
+_tasks_cache = VersionedCache()
+
+# list_tasks bodies larger than this many bytes are sent but not cached
+MAX_CACHED_TASKS_BODY = 1024 * 1024
+
+# list_tasks page size once paging is asked for: ?limit= is clamped to
+# MAX_TASKS_PAGE_SIZE, and a cursor without ?limit= gets the default
+DEFAULT_TASKS_PAGE_SIZE = 200
+MAX_TASKS_PAGE_SIZE = 1000
+
+# Most tasks one bulk-delete or bulk-reorder request may name
+MAX_BULK_TASKS = 1000
+
+# --- PREPARED STATEMENTS ---
+# Paged list_tasks uses keyset pagination on (position, task_id): a NULL
+# cursor starts from the beginning of the board.
+LIST_TASKS_SQL = """
+    SELECT 
+        t.task_id, t.event_id, t.title, t.description, 
+        t.status, t.priority, t.due_date, t.assigned_to, t.position,
+        u.first_name as assignee_name, u.last_name as assignee_last, u.email as assignee_email,
+        e.title as event_title
+    FROM planning_tasks t
+    LEFT JOIN users u ON t.assigned_to = u.user_id
+    LEFT JOIN events e ON t.event_id = e.event_id
+    WHERE {where}
+      AND (t.position, t.task_id) > (COALESCE({after_position}, '-infinity'::float8), COALESCE({after_id}, 0))
+    ORDER BY t.position, t.task_id
+    LIMIT {limit}
+"""
+
+# Without paging arguments every task is returned, newest first among
+# equal positions
+LIST_ALL_TASKS_SQL = """
+    SELECT 
+        t.task_id, t.event_id, t.title, t.description, 
+        t.status, t.priority, t.due_date, t.assigned_to, t.position,
+        u.first_name as assignee_name, u.last_name as assignee_last, u.email as assignee_email,
+        e.title as event_title
+    FROM planning_tasks t
+    LEFT JOIN users u ON t.assigned_to = u.user_id
+    LEFT JOIN events e ON t.event_id = e.event_id
+    WHERE {where}
+    ORDER BY t.position ASC, t.created_at DESC
+"""
+
+# Two statements (paged and unpaged) per list_tasks filter
+register_statement("list_tasks_all", LIST_TASKS_SQL.format(
+    where="TRUE", after_position="$1", after_id="$2", limit="$3",
+))
+register_statement("list_tasks_event", LIST_TASKS_SQL.format(
+    where="t.event_id = $1", after_position="$2", after_id="$3", limit="$4",
+))
+register_statement("list_tasks_global", LIST_TASKS_SQL.format(
+    where="t.event_id IS NULL", after_position="$1", after_id="$2", limit="$3",
+))
+register_statement("list_all_tasks_all", LIST_ALL_TASKS_SQL.format(where="TRUE"))
+register_statement("list_all_tasks_event", LIST_ALL_TASKS_SQL.format(where="t.event_id = $1"))
+register_statement("list_all_tasks_global", LIST_ALL_TASKS_SQL.format(where="t.event_id IS NULL"))
+
+# Append to the bottom: position is computed in the same statement
+register_statement("insert_task", """
+    INSERT INTO planning_tasks 
+    (event_id, title, description, status, priority, due_date, assigned_to, created_by, position)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8,
+            (SELECT COALESCE(MAX(position), 0) + 1000 FROM planning_tasks))
+    RETURNING task_id
+""")
+
+register_statement("delete_task", "DELETE FROM planning_tasks WHERE task_id = $1")
 
 def parse_dt(val: Optional[str]) -> Optional[datetime.datetime]:
     """
@@ -18,77 +104,150 @@ def parse_dt(val: Optional[str]) -> Optional[datetime.datetime]:
     """
     if not val: return None
     try:
-        if val.endswith('Z'): val = val[:-1] + '+00:00'
-        return datetime.datetime.fromisoformat(val)
+        return ciso8601.parse_datetime(val)
     except Exception: return None
 
+def parse_task_page_args() -> Tuple[Optional[float], Optional[int], Optional[int]]:
+    """
+    Read list_tasks pagination arguments from the query string.
+
+    Returns:
+        tuple: (after_position, after_id, limit). The cursor is None when the
+        client asks for the first page; everything is None when no paging
+        argument was given (all tasks).
+
+    Raises:
+        ValueError: If an argument is malformed or the cursor is incomplete.
+    """
+    args = request.args
+    if ("after_position" in args) != ("after_id" in args):
+        raise ValueError("after_position and after_id must be given together")
+
+    if "limit" not in args and "after_id" not in args:
+        return None, None, None
+
+    after_position = float(args["after_position"]) if "after_position" in args else None
+    after_id = int(args["after_id"]) if "after_id" in args else None
+    limit = int(args.get("limit", DEFAULT_TASKS_PAGE_SIZE))
+    return after_position, after_id, min(max(limit, 1), MAX_TASKS_PAGE_SIZE)
+
+# --- UPDATE STATEMENT ---
+UPDATABLE_TASK_FIELDS = (
+    'title', 'description', 'status', 'priority', 'due_date',
+    'assigned_to', 'event_id', 'position'
+)
+# Fields whose request value needs converting before it is stored
+TASK_FIELD_CONVERTERS = {'due_date': parse_dt}
+
+@lru_cache(maxsize=None)
+def update_task_sql(keys: Tuple[str, ...]) -> str:
+    """
+    Build the UPDATE for one combination of fields (in UPDATABLE_TASK_FIELDS
+    order); each of the at most 255 combinations is built only once.
+    """
+    assignments = ", ".join(f"{key} = %s" for key in keys)
+    return f"UPDATE planning_tasks SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE task_id = %s"
+
+# --- ACCESS CONTROL ---
+@planning_bp.before_request
+def require_planner() -> Optional[Tuple[Response, int]]:
+    """
+    Authenticate every planning request and allow admins and organizers only.
+
+    The caller is stored as g.user_id and g.role for the route. CORS
+    preflight requests carry no token and are passed through.
+
+    Returns:
+        None to continue to the route, or (error_response, 401/403).
+    """
+    if request.method == "OPTIONS":
+        return None
+
+    user_id, role, err, code = verify_token_from_request()
+    if err: return err, code
+
+    if role not in PLANNING_ROLES:
+        return jsonify({"error": "Permission denied"}), 403
+
+    g.user_id, g.role = user_id, role
+    return None
+
 @planning_bp.route("/tasks", methods=["GET"])
 def list_tasks() -> Tuple[Response, int]:
     """
-    Get all tasks ordered by position.
+    Get tasks ordered by position, one page at a time.
     
     Filters:
     - ?event_id=<id> : Filter by specific event.
     - ?event_id=global : Filter for tasks not linked to any event.
+
+    Paging (optional; without it every task is returned):
+    - ?limit=N (at most 1000), then ?after_position=&after_id= taken from
+      the last task of the previous page. A page shorter than the limit is
+      the last one.
     
     Permissions:
     - Admin or Organizer only.
-    
+
+    Caching:
+    - Bodies are reused until a planning task, event or user changes, and
+      If-None-Match is answered with 304.
+
     Returns:
         200: List of task objects with assignee and event details.
+        304: Not modified since the client's ETag.
+        400: Invalid pagination parameters.
         403: Forbidden.
         500: Database error.
     """
-    user_id, role, err, code = verify_token_from_request()
-    if err: return err, code
-
-    if role not in ['admin', 'organizer']:
-        return jsonify({"error": "Permission denied"}), 403
-
     event_filter = request.args.get('event_id')
+    try:
+        page = parse_task_page_args()
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
+
+    after_position, after_id, limit = page
+    # Only first pages are cached: cursors from the query string would
+    # otherwise give every request its own entry
+    cache_key = (event_filter, limit) if after_id is None else None
+    version = get_data_version("planning")
+    etag = make_etag(version, event_filter, *page)
+    if version is not None:
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag), 304
+        body = _tasks_cache.get(cache_key, version) if cache_key else None
+        if body is not None:
+            return with_etag(raw_json_response(body), etag), 200
     
-    sql = """
-        SELECT 
-            t.task_id, t.event_id, t.title, t.description, 
-            t.status, t.priority, t.due_date, t.assigned_to, t.position,
-            u.first_name as assignee_name, u.last_name as assignee_last, u.email as assignee_email,
-            e.title as event_title
-        FROM planning_tasks t
-        LEFT JOIN users u ON t.assigned_to = u.user_id
-        LEFT JOIN events e ON t.event_id = e.event_id
-    """
-    
-    params = []
-    conditions = []
-
-    if event_filter:
-        if event_filter == 'global':
-            conditions.append("t.event_id IS NULL")
-        else:
-            conditions.append("t.event_id = %s")
-            params.append(event_filter)
-    
-    if conditions:
-        sql += " WHERE " + " AND ".join(conditions)
-    
-    # Order by position ascending
-    sql += " ORDER BY t.position ASC, t.created_at DESC;"
+    if limit is None:
+        prefix, page_params = "list_all_tasks", ()
+    else:
+        prefix, page_params = "list_tasks", page
+
+    if not event_filter:
+        statement, params = f"{prefix}_all", page_params
+    elif event_filter == 'global':
+        statement, params = f"{prefix}_global", page_params
+    else:
+        statement, params = f"{prefix}_event", (event_filter,) + page_params
 
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, params)
-                tasks = [dict(row) for row in cur.fetchall()]
-                
-                for t in tasks:
-                    if t['due_date']:
-                        t['due_date'] = t['due_date'].isoformat()
-                        
-        return jsonify(tasks), 200
-    except Exception as e:
-        print(f"Error listing tasks: {e}")
+                execute_prepared(cur, statement, params)
+                body = encode_json(cur.fetchall())
+    except Exception:
+        logger.exception("Failed to list tasks")
         return jsonify({"error": "Failed to fetch tasks"}), 500
 
+    response = raw_json_response(body)
+    if version is None:
+        return response, 200
+
+    if cache_key and len(body) <= MAX_CACHED_TASKS_BODY:
+        _tasks_cache.set(cache_key, version, body)
+    return with_etag(response, etag), 200
+
 @planning_bp.route("/tasks", methods=["POST"])
 def create_task() -> Tuple[Response, int]:
     """
@@ -101,12 +260,6 @@ def create_task() -> Tuple[Response, int]:
         400: Validation error.
         403: Forbidden.
     """
-    user_id, role, err, code = verify_token_from_request()
-    if err: return err, code
-
-    if role not in ['admin', 'organizer']:
-        return jsonify({"error": "Permission denied"}), 403
-
     data: Dict[str, Any] = request.get_json() or {}
     
     if not data.get('title'):
@@ -115,19 +268,7 @@ def create_task() -> Tuple[Response, int]:
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                # Get current max position to append to bottom
-                cur.execute("SELECT COALESCE(MAX(position), 0) FROM planning_tasks")
-                result = cur.fetchone()
-                max_pos = result[0] if result else 0
-                new_pos = max_pos + 1000.0
-
-                sql = """
-                    INSERT INTO planning_tasks 
-                    (event_id, title, description, status, priority, due_date, assigned_to, created_by, position)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING task_id;
-                """
-                cur.execute(sql, (
+                execute_prepared(cur, "insert_task", (
                     data.get('event_id'),
                     data['title'],
                     data.get('description'),
@@ -135,15 +276,14 @@ def create_task() -> Tuple[Response, int]:
                     data.get('priority', 'medium'),
                     parse_dt(data.get('due_date')),
                     data.get('assigned_to'),
-                    user_id,
-                    new_pos
+                    g.user_id
                 ))
-                conn.commit()
                 new_id = cur.fetchone()['task_id']
+                conn.commit()
                 
         return jsonify({"task_id": new_id, "status": "created"}), 201
-    except Exception as e:
-        print(f"Error creating task: {e}")
+    except Exception:
+        logger.exception("Failed to create task")
         return jsonify({"error": "Failed to create task"}), 500
 
 @planning_bp.route("/tasks/<int:task_id>", methods=["PUT"])
@@ -160,40 +300,26 @@ def update_task(task_id: int) -> Tuple[Response, int]:
         400: No valid fields.
         403: Forbidden.
     """
-    user_id, role, err, code = verify_token_from_request()
-    if err: return err, code
-
-    if role not in ['admin', 'organizer']:
-        return jsonify({"error": "Permission denied"}), 403
-
     data: Dict[str, Any] = request.get_json() or {}
     
-    fields = []
-    values = []
-    allowed = ['title', 'description', 'status', 'priority', 'due_date', 'assigned_to', 'event_id', 'position']
-
-    for key in allowed:
-        if key in data:
-            fields.append(f"{key} = %s")
-            if key == 'due_date':
-                values.append(parse_dt(data[key]))
-            else:
-                values.append(data[key])
-    
-    if not fields:
+    keys = tuple(key for key in UPDATABLE_TASK_FIELDS if key in data)
+    if not keys:
         return jsonify({"error": "No valid fields to update"}), 400
-        
+
+    values = []
+    for key in keys:
+        convert = TASK_FIELD_CONVERTERS.get(key)
+        values.append(convert(data[key]) if convert else data[key])
     values.append(task_id)
     
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                sql = f"UPDATE planning_tasks SET {', '.join(fields)}, updated_at = CURRENT_TIMESTAMP WHERE task_id = %s"
-                cur.execute(sql, values)
+                cur.execute(update_task_sql(keys), values)
                 conn.commit()
-        return jsonify({"status": "updated"}), 200
-    except Exception as e:
-        print(f"Error updating task: {e}")
+        return raw_json_response(STATUS_UPDATED), 200
+    except Exception:
+        logger.exception("Failed to update task %s", task_id)
         return jsonify({"error": "Failed to update task"}), 500
 
 @planning_bp.route("/tasks/<int:task_id>", methods=["DELETE"])
@@ -202,21 +328,103 @@ def delete_task(task_id: int) -> Tuple[Response, int]:
     Delete a task.
     
     Returns:
-        200: Success status.
+        204: Deleted (empty body).
         403: Forbidden.
     """
-    user_id, role, err, code = verify_token_from_request()
-    if err: return err, code
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                execute_prepared(cur, "delete_task", (task_id,))
+                conn.commit()
+        return Response(status=204), 204
+    except Exception:
+        logger.exception("Failed to delete task %s", task_id)
+        return jsonify({"error": "Failed to delete task"}), 500
 
-    if role not in ['admin', 'organizer']:
-        return jsonify({"error": "Permission denied"}), 403
+@planning_bp.route("/tasks/bulk-delete", methods=["POST"])
+def bulk_delete_tasks() -> Tuple[Response, int]:
+    """
+    Delete several tasks in one statement.
+    
+    Body:
+        { "ids": [int, ...] }  (at most MAX_BULK_TASKS)
+    
+    Returns:
+        200: { "deleted": int }
+        400: Invalid ids.
+        403: Forbidden.
+    """
+    data: Dict[str, Any] = request.get_json() or {}
+    ids = data.get('ids')
+
+    if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+        return jsonify({"error": "ids must be a list of task ids"}), 400
+    if len(ids) > MAX_BULK_TASKS:
+        return jsonify({"error": f"At most {MAX_BULK_TASKS} tasks per request"}), 400
+    if not ids:
+        return jsonify({"deleted": 0}), 200
+
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                # psycopg2 binds the list as an integer array
+                cur.execute("DELETE FROM planning_tasks WHERE task_id = ANY(%s)", (ids,))
+                deleted = cur.rowcount
+                conn.commit()
+        return jsonify({"deleted": deleted}), 200
+    except Exception:
+        logger.exception("Failed to bulk delete tasks")
+        return jsonify({"error": "Failed to delete tasks"}), 500
+
+@planning_bp.route("/tasks/bulk-reorder", methods=["POST"])
+def bulk_reorder_tasks() -> Tuple[Response, int]:
+    """
+    Set the position of several tasks in one statement.
+    
+    Body:
+        { "tasks": [{ "task_id": int, "position": number }, ...] }
+        (at most MAX_BULK_TASKS, each task_id once)
+    
+    Returns:
+        200: { "updated": int }
+        400: Invalid task list.
+        403: Forbidden.
+    """
+    data: Dict[str, Any] = request.get_json() or {}
+    tasks = data.get('tasks')
+
+    if not isinstance(tasks, list) or not all(
+        isinstance(t, dict)
+        and type(t.get('task_id')) is int
+        and type(t.get('position')) in (int, float)
+        for t in tasks
+    ):
+        return jsonify({"error": "tasks must be a list of {task_id, position}"}), 400
+    if len(tasks) > MAX_BULK_TASKS:
+        return jsonify({"error": f"At most {MAX_BULK_TASKS} tasks per request"}), 400
+
+    rows = [(t['task_id'], t['position']) for t in tasks]
+    # UPDATE ... FROM would apply an arbitrary one of several positions
+    if len({task_id for task_id, _ in rows}) != len(rows):
+        return jsonify({"error": "Each task may appear only once"}), 400
+    if not rows:
+        return jsonify({"updated": 0}), 200
+
+    sql = """
+        UPDATE planning_tasks AS t
+        SET position = v.position, updated_at = CURRENT_TIMESTAMP
+        FROM (VALUES %s) AS v(task_id, position)
+        WHERE t.task_id = v.task_id
+    """
 
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM planning_tasks WHERE task_id = %s", (task_id,))
+                # A single page keeps this one statement (and rowcount accurate)
+                execute_values(cur, sql, rows, template="(%s::int, %s::float8)", page_size=len(rows))
+                updated = cur.rowcount
                 conn.commit()
-        return jsonify({"status": "deleted"}), 200
-    except Exception as e:
-        print(f"Error deleting task: {e}")
-        return jsonify({"error": "Failed to delete task"}), 500
\ No newline at end of file
+        return jsonify({"updated": updated}), 200
+    except Exception:
+        logger.exception("Failed to bulk reorder tasks")
+        return jsonify({"error": "Failed to reorder tasks"}), 500
@@ -1,14 +1,17 @@
 import pytest
 from flask import Flask
 from backend.auth_service.routes import auth_bp
+from backend.common.responses import OrjsonProvider
 import os
 
 # Ensure JWT_SECRET is set for tests
 os.environ["JWT_SECRET"] = "test_secret"
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def app():
+    # Built once for the whole run; tests must not change its config or routes
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.register_blueprint(auth_bp, url_prefix="/auth")
     
     from backend.events_service.routes import events_bp
@@ -20,6 +23,12 @@ def app():
     from backend.planning_service.routes import planning_bp
     app.register_blueprint(planning_bp, url_prefix="/planning")
 
+    from backend.venues_service.routes import venues_bp
+    app.register_blueprint(venues_bp, url_prefix="/venues")
+
+    from backend.database import db_connection
+    db_connection.init_app(app)
+
     app.config["TESTING"] = True
     return app
 
@@ -50,3 +59,91 @@ def mock_db(mocker):
     mocker.patch("backend.auth_service.routes.get_db", return_value=mock_conn)
     
     return mock_conn, mock_cursor
+
+class FakeCursor:
+    """
+    Minimal stand-in for a RealDictCursor.
+
+    fetchone()/fetchall() return queued `results` first (one per fetch),
+    then `result`. Every execute() is recorded in `executed`.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self.result = None
+        self.results = []
+        self.executed = []
+        self.rowcount = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.results.pop(0) if self.results else self.result
+
+    def fetchall(self):
+        return self.fetchone() or []
+
+    def close(self):
+        self.closed = True
+
+class FakeConn:
+    """
+    Minimal stand-in for a pooled connection (see db_connection.get_db).
+    """
+    def __init__(self):
+        self.prepared = set()
+        self.commits = 0
+        self.rollbacks = 0
+        self._cursor = FakeCursor(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+@pytest.fixture
+def patch_db(mocker):
+    """
+    Returns patch(module): replaces get_db in a routes module (dotted path)
+    with a FakeConn and returns (conn, cursor).
+    """
+    def patch(module):
+        conn = FakeConn()
+        mocker.patch(f"{module}.get_db", return_value=conn)
+        return conn, conn.cursor()
+    return patch
+
+@pytest.fixture
+def fake_db(patch_db):
+    """
+    Patches the events service's get_db with a FakeConn.
+    """
+    return patch_db("backend.events_service.routes")
+
+
+@pytest.fixture
+def planning_db(patch_db, mocker):
+    """
+    Patches the planning service's get_db with a FakeConn, signs the caller
+    in as organizer 1 and turns the data-version cache off.
+    """
+    mocker.patch("backend.planning_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
+    mocker.patch("backend.planning_service.routes.get_data_version", return_value=None)
+    return patch_db("backend.planning_service.routes")
@@ -47,6 +47,11 @@ def test_login_success(client, mock_db, mocker):
         "password_hash": "hashed_secret",
         "role": "attendee"
     }
+    # Venue list prefetched for the event forms
+    mock_conn.prepared = set()
+    mock_cursor.connection = mock_conn
+    mock_cursor.fetchall.return_value = [{"venue_id": 3, "name": "Hall"}]
+    mocker.patch("backend.auth_service.routes.current_venue_list_etag", return_value='W/"abc"')
     
     # Mock PasswordHasher instance
     mock_ph = mocker.patch("backend.auth_service.routes.ph")
@@ -63,6 +68,8 @@ def test_login_success(client, mock_db, mocker):
     data = response.get_json()
     assert data["user_id"] == 1
     assert "token" in data
+    assert data["venues"] == [{"venue_id": 3, "name": "Hall"}]
+    assert data["venues_etag"] == 'W/"abc"'
 
 def test_login_invalid_credentials(client, mock_db, mocker):
     mock_conn, mock_cursor = mock_db
@@ -1,5 +1,6 @@
 import pytest
 from backend.auth_service.utils import create_token, verify_token, verify_token_from_request
+from backend.auth_service import utils
 import jwt
 import os
 from datetime import datetime, timedelta
@@ -34,6 +35,14 @@ def test_verify_token():
     decoded_user_id = verify_token(token)
     assert decoded_user_id == user_id
 
+def test_verify_token_cached_still_expires(mocker):
+    token = create_token(457, "attendee")
+    assert verify_token(token) == 457  # Populates the decode cache
+
+    far_future = (datetime.now() + timedelta(days=3650)).timestamp()
+    mocker.patch("backend.auth_service.utils.time.time", return_value=far_future)
+    assert verify_token(token) is None
+
 def test_verify_token_invalid():
     assert verify_token("invalid.token.here") is None
 
@@ -73,3 +82,14 @@ def test_verify_token_from_request_wrong_role(app):
         assert uid is None
         assert code == 403
         assert err.json["error"] == "permission denied"
+
+def test_verify_token_from_request_verifies_once_per_request(app, mocker):
+    token = create_token(222, "attendee")
+    verify = mocker.spy(utils, "_verify")
+
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        assert verify_token_from_request()[:2] == (222, "attendee")
+        # Role checks still apply to the remembered identity
+        assert verify_token_from_request(required_roles=["admin"])[3] == 403
+
+    verify.assert_called_once()
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+from psycopg2.pool import PoolError
+from unittest.mock import MagicMock
+from backend.database import db_connection
+
+def pooled_conn(age=0, idle=0):
+    now = time.monotonic()
+    return MagicMock(closed=0, opened_at=now - age, returned_at=now - idle)
+
+def test_get_db_reuses_pooled_connection_within_request(app, mocker):
+    conn = pooled_conn()
+    pool = MagicMock()
+    pool.getconn.return_value = conn
+    mocker.patch("backend.database.db_connection.get_pool", return_value=pool)
+
+    with app.app_context():
+        assert db_connection.get_db() is conn
+        assert db_connection.get_db() is conn
+
+    pool.getconn.assert_called_once()
+    pool.putconn.assert_called_once_with(conn, close=False)
+    conn.close.assert_not_called()
+
+def test_get_db_outside_app_context_returns_new_connection(mocker):
+    connect = mocker.patch("backend.database.db_connection._connect", side_effect=[MagicMock(), MagicMock()])
+
+    assert db_connection.get_db() is not db_connection.get_db()
+    assert connect.call_count == 2
+
+def test_get_db_waits_for_a_free_pool_slot(app, mocker):
+    pool = mocker.patch("backend.database.db_connection.get_pool").return_value
+    pool.getconn.side_effect = lambda: pooled_conn()
+    mocker.patch("backend.database.db_connection._pool_slots", threading.BoundedSemaphore(1))
+    mocker.patch("backend.database.db_connection.POOL_TIMEOUT", 0.01)
+
+    with app.app_context():
+        db_connection.get_db()
+        # Another request cannot check out a second connection...
+        with app.app_context():
+            with pytest.raises(PoolError):
+                db_connection.get_db()
+
+    # ...until the first one is returned at teardown
+    with app.app_context():
+        db_connection.get_db()
+
+def test_get_db_replaces_closed_and_expired_connections(app, mocker):
+    closed = pooled_conn()
+    closed.closed = 1
+    expired = pooled_conn(age=db_connection.POOL_RECYCLE + 1)
+    fresh = pooled_conn()
+    pool = MagicMock()
+    pool.getconn.side_effect = [closed, expired, fresh]
+    mocker.patch("backend.database.db_connection.get_pool", return_value=pool)
+
+    with app.app_context():
+        assert db_connection.get_db() is fresh
+
+    pool.putconn.assert_any_call(closed, close=True)
+    pool.putconn.assert_any_call(expired, close=True)
+    # Recently used connections are not pinged
+    fresh.cursor.assert_not_called()
+
+def test_get_db_pings_idle_connections(app, mocker):
+    dead = pooled_conn(idle=db_connection.POOL_PING_AFTER + 1)
+    dead.cursor.return_value.__enter__.return_value.execute.side_effect = db_connection.psycopg2.OperationalError
+    alive = pooled_conn(idle=db_connection.POOL_PING_AFTER + 1)
+    pool = MagicMock()
+    pool.getconn.side_effect = [dead, alive]
+    mocker.patch("backend.database.db_connection.get_pool", return_value=pool)
+
+    with app.app_context():
+        assert db_connection.get_db() is alive
+
+    pool.putconn.assert_any_call(dead, close=True)
+    alive.rollback.assert_called_once()
+
+def test_get_db_gives_up_when_no_connection_is_usable(app, mocker):
+    pool = MagicMock()
+    pool.getconn.side_effect = lambda: MagicMock(closed=1)
+    mocker.patch("backend.database.db_connection.get_pool", return_value=pool)
+
+    with app.app_context():
+        with pytest.raises(PoolError):
+            db_connection.get_db()
+
+    assert pool.getconn.call_count == db_connection.POOL_MAX_CONN + 1
+
+def test_get_data_version_warns_once_per_name(mocker, caplog):
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.cursor.return_value.__enter__.return_value.execute.side_effect = db_connection.psycopg2.ProgrammingError("missing table")
+    mocker.patch("backend.database.db_connection.get_db", return_value=conn)
+    mocker.patch("backend.database.db_connection._unreadable_versions", set())
+
+    with caplog.at_level("WARNING", logger="backend.database.db_connection"):
+        assert db_connection.get_data_version("events") is None
+        assert db_connection.get_data_version("events") is None
+
+    assert len(caplog.records) == 1
@@ -1,35 +1,19 @@
 import pytest
-from unittest.mock import MagicMock
-
-def test_list_events(client, mocker):
-    # Mock database connection and cursor
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    # Mock get_db in events_service
-    mocker.patch("backend.events_service.routes.get_db", return_value=mock_conn)
+from datetime import datetime
+
+def test_list_events(client, mocker, fake_db):
+    conn, cur = fake_db
+    mocker.patch("backend.events_service.routes.get_data_version", return_value=3)
     
     # Mock verify_token (optional, if we want to test authenticated flow)
     mocker.patch("backend.events_service.routes.verify_token", return_value=1)
 
-    # Mock DB response
-    from datetime import datetime
-    mock_cursor.fetchall.return_value = [
-        {
-            "event_id": 1, 
-            "title": "Test Event", 
-            "description": "Desc", 
-            "start_time": datetime(2025, 1, 1, 10, 0, 0),
-            "end_time": datetime(2025, 1, 1, 12, 0, 0),
-            "visibility": "public",
-            "avg_rating": 4.5
-        }
-    ]
+    # Mock DB response (Postgres returns the aggregated JSON array as text)
+    cur.result = {
+        "events_json": '[{"event_id": 1, "title": "Test Event", "description": "Desc", '
+                       '"start_time": "2025-01-01T10:00:00Z", "end_time": "2025-01-01T12:00:00Z", '
+                       '"visibility": "public", "avg_rating": 4.5}]'
+    }
 
     response = client.get("/events/")
     assert response.status_code == 200
@@ -38,25 +22,42 @@ def test_list_events(client, mocker):
     assert data[0]["title"] == "Test Event"
     assert data[0]["avg_rating"] == 4.5
 
-def test_get_event_detail(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.events_service.routes.get_db", return_value=mock_conn)
+    # Same data version: revalidation skips the events query
+    cur.executed.clear()
+    response = client.get("/events/", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert cur.executed == []
+
+def test_list_events_keyset_page(client, mocker, fake_db):
+    conn, cur = fake_db
+    mocker.patch("backend.events_service.routes.get_data_version", return_value=None)
+    cur.result = {"events_json": "[]"}
+
+    response = client.get("/events/?after_time=2025-01-01T10:00:00Z&after_id=7&limit=5000")
+    assert response.status_code == 200
+
+    # Cursor is bound as naive UTC and the limit is clamped
+    sql, params = cur.executed[-1]
+    assert params == (datetime(2025, 1, 1, 10, 0), 7, 500)
+
+def test_list_events_invalid_cursor(client, fake_db):
+    conn, cur = fake_db
+
+    response = client.get("/events/?after_id=7")
+    assert response.status_code == 400
+    assert cur.executed == []
 
-    # Mock DB response
-    from datetime import datetime
-    mock_cursor.fetchone.return_value = {
+def test_get_event_detail(client, fake_db):
+    conn, cur = fake_db
+
+    # Mock DB response (timestamps are formatted by Postgres)
+    cur.result = {
         "event_id": 1, 
         "title": "Test Event", 
         "description": "Desc", 
-        "start_time": datetime(2025, 1, 1, 10, 0, 0),
-        "end_time": datetime(2025, 1, 1, 12, 0, 0),
+        "start_time": "2025-01-01T10:00:00Z",
+        "end_time": "2025-01-01T12:00:00Z",
         "visibility": "public",
         "organizer_id": 1,
         "created_by": 1,
@@ -67,22 +68,15 @@ def test_get_event_detail(client, mocker):
     assert response.status_code == 200
     data = response.get_json()
     assert data["title"] == "Test Event"
+    assert data["start_time"] == "2025-01-01T10:00:00Z"
 
-def test_create_event_success(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.events_service.routes.get_db", return_value=mock_conn)
+def test_create_event_success(client, mocker, fake_db):
+    conn, cur = fake_db
     
     # Mock verify_token_from_request to return a valid user
     mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
 
-    mock_cursor.fetchone.return_value = {"event_id": 100}
+    cur.result = {"event_id": 100}
 
     payload = {
         "title": "New Event",
@@ -98,6 +92,25 @@ def test_create_event_success(client, mocker):
     assert response.status_code == 201
     assert response.get_json()["event_id"] == 100
 
+def test_create_event_venue_conflict(client, mocker, fake_db):
+    conn, cur = fake_db
+    mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
+
+    # The guarded INSERT returns no row when the venue is already booked
+    cur.result = None
+
+    payload = {
+        "title": "Clashing Event",
+        "start_time": "2025-05-01T10:00:00Z",
+        "end_time": "2025-05-01T12:00:00Z",
+        "location_type": "venue",
+        "venue_id": 3
+    }
+
+    response = client.post("/events/", json=payload)
+    assert response.status_code == 409
+    assert len(cur.executed) == 1
+
 def test_create_event_invalid_input(client, mocker):
     mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
     
@@ -108,29 +121,17 @@ def test_create_event_invalid_input(client, mocker):
     response = client.post("/events/", json=payload)
     assert response.status_code == 400
 
-def test_update_event(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.events_service.routes.get_db", return_value=mock_conn)
+def test_update_event(client, mocker, fake_db):
+    conn, cur = fake_db
     mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
 
-    # Mock fetchone for existing event check
-    from datetime import datetime
-    mock_cursor.fetchone.return_value = {
-        "organizer_id": 1,
-        "created_by": 1,
+    # Row returned by UPDATE ... RETURNING
+    cur.result = {
         "start_time": datetime(2025, 1, 1, 10, 0, 0),
         "end_time": datetime(2025, 1, 1, 12, 0, 0),
         "location_type": "custom",
         "venue_id": None,
         "custom_location_address": "Old Address",
-        "visibility": "public"
     }
 
     payload = {"title": "Updated Title"}
@@ -138,38 +139,59 @@ def test_update_event(client, mocker):
     assert response.status_code == 200
     assert response.get_json()["status"] == "updated"
 
-def test_delete_event(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.events_service.routes.get_db", return_value=mock_conn)
+def test_update_event_not_owner(client, mocker, fake_db):
+    conn, cur = fake_db
+    mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(2, "attendee", None, None))
+
+    # UPDATE matches no row, but the event exists
+    cur.results = [None, {"exists": 1}]
+
+    response = client.put("/events/1", json={"title": "Hijacked"})
+    assert response.status_code == 403
+    assert conn.commits == 0
+
+def test_delete_event(client, mocker, fake_db):
+    conn, cur = fake_db
     mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
 
-    mock_cursor.fetchone.return_value = {"organizer_id": 1, "created_by": 1}
-    mock_cursor.rowcount = 1
+    cur.result = {"event_id": 1}
 
     response = client.delete("/events/1")
     assert response.status_code == 200
     assert response.get_json()["status"] == "deleted"
+    assert len(cur.executed) == 1
+    assert conn.commits == 1
 
-def test_rsvp_event(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.events_service.routes.get_db", return_value=mock_conn)
+def test_delete_event_not_owner(client, mocker, fake_db):
+    conn, cur = fake_db
+    mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(2, "attendee", None, None))
+
+    # DELETE matches nothing, but the event exists
+    cur.results = [None, {"exists": 1}]
+
+    response = client.delete("/events/1")
+    assert response.status_code == 403
+    assert conn.commits == 0
+
+def test_rsvp_event(client, mocker, fake_db):
+    conn, cur = fake_db
     mocker.patch("backend.events_service.routes.verify_token_from_request", return_value=(1, "attendee", None, None))
 
     payload = {"status": "going"}
     response = client.post("/events/1/rsvp", json=payload)
     assert response.status_code == 200
     assert response.get_json()["status"] == "going"
+    # Prepared once on this connection, then executed
+    assert cur.executed[-1][0].startswith("EXECUTE rsvp_upsert(")
+    assert "rsvp_upsert" in conn.prepared
+
+def test_get_event_reviews_times_in_utc(client, mocker, fake_db):
+    conn, cur = fake_db
+    mocker.patch("backend.events_service.routes.get_data_version", return_value=None)
+    cur.result = [{"review_id": 1, "rating": 5, "created_at": "2025-01-01T10:00:00Z"}]
+
+    response = client.get("/events/1/reviews")
+    assert response.status_code == 200
+    assert response.get_json()[0]["created_at"] == "2025-01-01T10:00:00Z"
+    # Same convention as the event times
+    assert """AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"'""" in cur.executed[-1][0]
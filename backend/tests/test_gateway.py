@@ -0,0 +1,25 @@
+import pytest
+from backend.gateway.server import create_app
+from backend.common.responses import STATUS_OK
+
+@pytest.fixture(scope="module")
+def gateway_client():
+    return create_app().test_client()
+
+def test_health(gateway_client):
+    for path in ("/health", "/health/"):
+        response = gateway_client.get(path)
+        assert response.status_code == 200
+        assert response.data == STATUS_OK
+        assert response.get_json() == {"status": "ok"}
+
+def test_ping(gateway_client):
+    response = gateway_client.get("/")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "gateway_ok"}
+
+def test_health_cors_headers_are_per_request(gateway_client):
+    # The pre-encoded body must not carry headers over between requests
+    for origin in ("http://localhost:8080", "http://localhost:5500"):
+        response = gateway_client.get("/health", headers={"Origin": origin})
+        assert response.headers.getlist("Access-Control-Allow-Origin") == [origin]
@@ -1,47 +1,86 @@
 import pytest
-from unittest.mock import MagicMock
 from datetime import datetime
+from backend.common.cache import VersionedCache
 
-def test_list_tasks(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.planning_service.routes.get_db", return_value=mock_conn)
-    mocker.patch("backend.planning_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
-
-    mock_cursor.fetchall.return_value = [
-        {
-            "task_id": 1,
-            "title": "Task 1",
-            "due_date": datetime(2025, 1, 1, 10, 0, 0),
-            "position": 1000.0
-        }
+def test_list_tasks(client, planning_db):
+    conn, cur = planning_db
+    cur.result = [
+        {"task_id": 1, "title": "Task 1", "due_date": datetime(2025, 1, 1, 10, 0, 0), "position": 1000.0},
+        {"task_id": 2, "title": "Task 2", "due_date": None, "position": 2000.0},
     ]
 
     response = client.get("/planning/tasks")
     assert response.status_code == 200
     data = response.get_json()
-    assert len(data) == 1
+    assert len(data) == 2
     assert data[0]["title"] == "Task 1"
+    assert data[0]["due_date"] == "2025-01-01T10:00:00"
+    # No paging arguments: every task, unpaged
+    assert cur.executed[-1] == ("EXECUTE list_all_tasks_all;", None)
+    assert "ORDER BY t.position ASC, t.created_at DESC" in cur.executed[0][0]
 
-def test_create_task(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.planning_service.routes.get_db", return_value=mock_conn)
-    mocker.patch("backend.planning_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
+    # A cursor without a limit gets the default page size
+    client.get("/planning/tasks?after_position=2000&after_id=2")
+    assert cur.executed[-1][1] == (2000.0, 2, 200)
+
+def test_list_tasks_pagination(client, planning_db):
+    conn, cur = planning_db
+    conn.prepared.add("list_tasks_event")
+
+    response = client.get("/planning/tasks?event_id=3&limit=5000&after_position=2000&after_id=7")
+    assert response.status_code == 200
+    assert response.get_json() == []
+    # Cursor from the last task of the previous page; limit clamped to the maximum
+    assert cur.executed[-1][1] == ("3", 2000.0, 7, 1000)
+
+    # Half a cursor or a malformed value is rejected before touching the database
+    assert client.get("/planning/tasks?after_id=7").status_code == 400
+    assert client.get("/planning/tasks?limit=abc").status_code == 400
+    assert len(cur.executed) == 1
+
+def test_list_tasks_cached_per_data_version(client, planning_db, mocker):
+    conn, cur = planning_db
+    mocker.patch("backend.planning_service.routes._tasks_cache", VersionedCache())
+    version = mocker.patch("backend.planning_service.routes.get_data_version", return_value=7)
+    conn.prepared.update({"list_all_tasks_event", "list_tasks_event"})
+    cur.results = [[{"task_id": 1, "title": "Task 1", "due_date": None}]]
 
-    mock_cursor.fetchone.side_effect = [[1000.0], {"task_id": 2}]
+    first = client.get("/planning/tasks?event_id=3")
+    assert first.get_json() == [{"task_id": 1, "title": "Task 1", "due_date": None}]
+    second = client.get("/planning/tasks?event_id=3")
+    assert second.get_json() == first.get_json()
+    assert len(cur.executed) == 1
+
+    # Conditional request with the current ETag
+    response = client.get("/planning/tasks?event_id=3", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+    # Any write bumps the version and the next read hits the database again
+    version.return_value = 8
+    assert client.get("/planning/tasks?event_id=3").status_code == 200
+    assert len(cur.executed) == 2
+
+    # Later pages are not cached
+    for _ in range(2):
+        client.get("/planning/tasks?event_id=3&after_position=1000&after_id=1")
+    assert len(cur.executed) == 4
+
+def test_tasks_cache_evicts_least_recently_used():
+    cache = VersionedCache(max_entries=2)
+    cache.set("a", 1, b"A")
+    cache.set("b", 1, b"B")
+    assert cache.get("a", 1) == b"A"
+    cache.set("c", 1, b"C")
+    # "b" was used least recently; "a" survives
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == b"A"
+    assert cache.get("c", 1) == b"C"
+
+def test_create_task(client, planning_db):
+    conn, cur = planning_db
+    cur.result = {"task_id": 2}
+    # Statement already prepared on this connection
+    conn.prepared.add("insert_task")
 
     payload = {
         "title": "New Task",
@@ -51,36 +90,89 @@ def test_create_task(client, mocker):
     response = client.post("/planning/tasks", json=payload)
     assert response.status_code == 201
     assert response.get_json()["task_id"] == 2
+    # Position is assigned inside the INSERT: one round trip
+    assert len(cur.executed) == 1
+    sql, params = cur.executed[0]
+    assert sql.startswith("EXECUTE insert_task(")
+    # created_by comes from the authenticated caller
+    assert params[-1] == 1
+    assert conn.commits == 1
 
-def test_update_task(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.planning_service.routes.get_db", return_value=mock_conn)
-    mocker.patch("backend.planning_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
+def test_update_task(client, planning_db):
+    conn, cur = planning_db
 
-    payload = {"title": "Updated Task"}
+    payload = {"due_date": "2025-01-01T10:00:00", "title": "Updated Task", "created_by": 5}
     response = client.put("/planning/tasks/1", json=payload)
     assert response.status_code == 200
     assert response.get_json()["status"] == "updated"
 
-def test_delete_task(client, mocker):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    mock_cursor.__enter__.return_value = mock_cursor
-    mock_cursor.__exit__.return_value = None
-    mock_conn.cursor.return_value = mock_cursor
-    
-    mocker.patch("backend.planning_service.routes.get_db", return_value=mock_conn)
-    mocker.patch("backend.planning_service.routes.verify_token_from_request", return_value=(1, "organizer", None, None))
+    # Only allowed fields, in a fixed order, with due_date parsed
+    sql, values = cur.executed[-1]
+    assert sql.startswith("UPDATE planning_tasks SET title = %s, due_date = %s, updated_at")
+    assert values == ["Updated Task", datetime(2025, 1, 1, 10, 0), 1]
+
+def test_delete_task(client, planning_db):
+    conn, cur = planning_db
 
     response = client.delete("/planning/tasks/1")
+    assert response.status_code == 204
+    assert response.data == b""
+    assert cur.executed[-1] == ("EXECUTE delete_task(%s);", (1,))
+
+def test_bulk_delete_tasks(client, planning_db):
+    conn, cur = planning_db
+    cur.rowcount = 3
+
+    response = client.post("/planning/tasks/bulk-delete", json={"ids": [1, 2, 3]})
     assert response.status_code == 200
-    assert response.get_json()["status"] == "deleted"
+    assert response.get_json()["deleted"] == 3
+    assert cur.executed == [("DELETE FROM planning_tasks WHERE task_id = ANY(%s)", ([1, 2, 3],))]
+
+    response = client.post("/planning/tasks/bulk-delete", json={"ids": ["1; DROP"]})
+    assert response.status_code == 400
+    response = client.post("/planning/tasks/bulk-delete", json={"ids": list(range(1001))})
+    assert response.status_code == 400
+    assert len(cur.executed) == 1
+
+def test_bulk_reorder_tasks(client, planning_db, mocker):
+    conn, cur = planning_db
+    execute_values = mocker.patch("backend.planning_service.routes.execute_values")
+    cur.rowcount = 2
+
+    tasks = [{"task_id": 1, "position": 1000}, {"task_id": 2, "position": 1500.5}]
+    response = client.post("/planning/tasks/bulk-reorder", json={"tasks": tasks})
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 2
+    # All rows go out in a single statement
+    _, sql, rows = execute_values.call_args[0]
+    assert "FROM (VALUES %s)" in sql
+    assert rows == [(1, 1000), (2, 1500.5)]
+    assert execute_values.call_args[1] == {"template": "(%s::int, %s::float8)", "page_size": 2}
+
+    invalid = [
+        {"tasks": {"task_id": 1, "position": 1}},
+        {"tasks": [{"task_id": 1}]},
+        {"tasks": [{"task_id": 1, "position": True}]},
+        {"tasks": [{"task_id": "1", "position": 1}]},
+        {"tasks": [1, 2]},
+        {"tasks": [{"task_id": 1, "position": 1}, {"task_id": 1, "position": 2}]},
+        {"tasks": [{"task_id": i, "position": i} for i in range(1001)]},
+    ]
+    for body in invalid:
+        assert client.post("/planning/tasks/bulk-reorder", json=body).status_code == 400
+    execute_values.assert_called_once()
+
+def test_planning_requires_planner_role(client, mocker):
+    get_db = mocker.patch("backend.planning_service.routes.get_db")
+    verify = mocker.patch("backend.planning_service.routes.verify_token_from_request",
+                          return_value=(5, "attendee", None, None))
+
+    # Every route is guarded before the handler runs
+    assert client.get("/planning/tasks").status_code == 403
+    assert client.post("/planning/tasks", json={"title": "x"}).status_code == 403
+    assert client.delete("/planning/tasks/1").status_code == 403
+    assert client.post("/planning/tasks/bulk-delete", json={"ids": [1]}).status_code == 403
+
+    verify.return_value = (None, None, {"error": "missing token"}, 401)
+    assert client.put("/planning/tasks/1", json={"title": "x"}).status_code == 401
+    get_db.assert_not_called()
@@ -0,0 +1,122 @@
+import gzip
+import json
+import pytest
+from backend.auth_service.utils import create_token
+from backend.common.cache import VersionedCache
+
+def auth(role):
+    return {"Authorization": f"Bearer {create_token(1, role)}"}
+
+@pytest.fixture
+def venues_db(patch_db, mocker):
+    mocker.patch("backend.venues_service.routes.get_data_version", return_value=None)
+    return patch_db("backend.venues_service.routes")
+
+def test_list_venues(client, venues_db):
+    conn, cur = venues_db
+    cur.result = [
+        {"venue_id": 1, "name": "Hall A", "building": "Main"},
+        {"venue_id": 2, "name": "Hall B", "building": "Main"},
+    ]
+
+    response = client.get("/venues/")
+    assert response.status_code == 200
+    assert [v["name"] for v in response.get_json()] == ["Hall A", "Hall B"]
+    assert cur.executed[-1][1] == (None,)
+
+def test_list_venues_pagination(client, venues_db):
+    conn, cur = venues_db
+
+    response = client.get("/venues/?limit=10&after_name=Hall%20A&after_id=1")
+    assert response.status_code == 200
+    assert response.get_json() == []
+    # Prepared on first use, then executed
+    assert "SELECT venue_id, name, building, room_number, google_maps_link FROM venues" in cur.executed[0][0]
+    assert "(name, venue_id) > ($1, $2)" in cur.executed[0][0]
+    assert cur.executed[-1] == ("EXECUTE list_venues_after(%s, %s, %s);", ("Hall A", 1, 10))
+
+    # Half a cursor is rejected before touching the database
+    assert client.get("/venues/?after_name=Hall%20A").status_code == 400
+    assert len(cur.executed) == 2
+
+def test_list_venues_cached_per_data_version(client, venues_db, mocker):
+    conn, cur = venues_db
+    mocker.patch("backend.venues_service.routes._venues_cache", VersionedCache(max_entries=1))
+    version = mocker.patch("backend.venues_service.routes.get_data_version", return_value=3)
+    conn.prepared.add("list_venues_first")
+    cur.results = [[{"venue_id": 1, "name": "Hall A"}]]
+
+    first = client.get("/venues/")
+    assert first.get_json() == [{"venue_id": 1, "name": "Hall A"}]
+    second = client.get("/venues/")
+    assert second.get_json() == first.get_json()
+    assert len(cur.executed) == 1
+
+    response = client.get("/venues/", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+    # Cached bodies are gzipped for clients that accept it
+    response = client.get("/venues/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == first.get_json()
+    # The compressed copy is kept with the body
+    assert client.get("/venues/", headers={"Accept-Encoding": "gzip"}).data == response.data
+    assert len(cur.executed) == 1
+
+    # A venue write bumps the version
+    version.return_value = 4
+    assert client.get("/venues/").get_json() == []
+    assert len(cur.executed) == 2
+
+    # Paged requests are not cached
+    conn.prepared.add("list_venues_after")
+    for _ in range(2):
+        client.get("/venues/?after_name=Hall%20A&after_id=1")
+        client.get("/venues/?limit=10")
+    assert len(cur.executed) == 6
+
+def test_update_venue(client, venues_db):
+    conn, cur = venues_db
+    cur.result = {"venue_id": 4, "name": "Hall C", "building": "West"}
+
+    response = client.put("/venues/4", json={"building": "West", "name": "Hall C", "capacity": 10}, headers=auth("admin"))
+    assert response.status_code == 200
+    assert response.get_json()["building"] == "West"
+    # Fields in a fixed order; unknown ones ignored
+    assert "UPDATE venues SET name = $1, building = $2 WHERE venue_id = $3 RETURNING venue_id, name, building" in cur.executed[0][0]
+    assert cur.executed[-1] == ("EXECUTE update_venue_name_building(%s, %s, %s);", ["Hall C", "West", 4])
+
+    assert client.put("/venues/4", json={"capacity": 10}, headers=auth("admin")).status_code == 400
+    assert client.put("/venues/4", json=[{"name": "x"}], headers=auth("admin")).status_code == 400
+
+def test_create_venue_returns_the_row(client, venues_db):
+    conn, cur = venues_db
+    row = {"venue_id": 9, "name": "Hall D", "building": "East", "room_number": None, "google_maps_link": None}
+    cur.result = row
+    conn.prepared.add("insert_venue")
+
+    response = client.post("/venues/", json={"name": "Hall D", "building": "East"}, headers=auth("admin"))
+    assert response.status_code == 201
+    assert response.get_json() == row
+    # Statement already prepared on this connection: one round trip
+    assert len(cur.executed) == 1
+    assert conn.commits == 1
+
+    assert client.post("/venues/", json={"name": "Hall D"}, headers=auth("admin")).status_code == 400
+
+def test_venue_writes_require_admin(client, venues_db):
+    conn, cur = venues_db
+
+    assert client.post("/venues/", json={"name": "A", "building": "B"}).status_code == 401
+    assert client.put("/venues/1", json={"name": "A"}, headers=auth("organizer")).status_code == 403
+    assert client.delete("/venues/1", headers=auth("attendee")).status_code == 403
+    assert cur.executed == []
+
+def test_delete_venue(client, venues_db):
+    conn, cur = venues_db
+
+    cur.rowcount = 1
+    assert client.delete("/venues/1", headers=auth("admin")).status_code == 200
+    cur.rowcount = 0
+    assert client.delete("/venues/2", headers=auth("admin")).status_code == 404
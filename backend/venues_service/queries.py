@@ -0,0 +1,47 @@
+"""
+Venue queries shared by the venues routes and other services (e.g. login,
+which embeds the venue list in its response).
+"""
+
+from typing import Optional
+
+from werkzeug.http import quote_etag
+
+from backend.database.db_connection import get_data_version, register_statement, execute_prepared
+from backend.common.responses import make_etag
+
+# Columns sent to clients; all covered by idx_venues_name_id, so listing
+# stays an index-only scan
+VENUE_COLUMNS = "venue_id, name, building, room_number, google_maps_link"
+
+# Keyset pagination on (name, venue_id); a NULL limit means LIMIT ALL
+LIST_VENUES_SQL = f"SELECT {VENUE_COLUMNS} FROM venues {{where}} ORDER BY name, venue_id LIMIT {{limit}}"
+register_statement("list_venues_first", LIST_VENUES_SQL.format(where="", limit="$1"))
+register_statement("list_venues_after", LIST_VENUES_SQL.format(
+    where="WHERE (name, venue_id) > ($1, $2)", limit="$3",
+))
+
+
+def fetch_all_venues(cur) -> list:
+    """
+    Return every venue in list_venues order.
+
+    Args:
+        cur: A cursor from get_db().
+    """
+    execute_prepared(cur, "list_venues_first", (None,))
+    return cur.fetchall()
+
+
+def current_venue_list_etag() -> Optional[str]:
+    """
+    ETag header value a client can send back to GET /venues/ to revalidate
+    a list from fetch_all_venues(), or None if the venues version cannot be
+    read. Call it before fetching the list, so a write in between makes the
+    ETag stale rather than the list.
+    """
+    version = get_data_version("venues")
+    if version is None:
+        return None
+    # Same parts as list_venues uses for an unpaged request
+    return quote_etag(make_etag(version, None, None, None), weak=True)
@@ -3,38 +3,164 @@ Venues service route handlers.
 Manages on-campus locations and their details.
 """
 
-from typing import Tuple, Dict, Any
+import logging
+from itertools import combinations
+from typing import Tuple, Dict, Any, Optional
 
-from flask import Blueprint, request, jsonify, Response
-from backend.database.db_connection import get_db
-from backend.auth_service.utils import verify_token_from_request
+from flask import Blueprint, request, Response
+from backend.database.db_connection import get_db, get_data_version, register_statement, execute_prepared
+from backend.auth_service.utils import require_roles
+from backend.venues_service.queries import VENUE_COLUMNS
+from backend.common.cache import VersionedCache
+from backend.common.responses import (
+    json_response, raw_json_response, gzip_json_response, gzip_body, encode_json,
+    make_etag, with_etag, not_modified, STATUS_DELETED,
+)
 
 venues_bp = Blueprint("venues", __name__)
+logger = logging.getLogger(__name__)
+
+# The encoded full venue list (GET /venues/ with no paging arguments, as the
+# venue pickers load it), valid for one 'venues' data version. Entries are
+# (body, gzipped body); the latter is built on the first hit that accepts gzip.
+_venues_cache = VersionedCache(max_entries=1)
+
+# Largest ?limit= list_venues accepts
+MAX_VENUES_PAGE_SIZE = 500
+
+# --- PREPARED STATEMENTS ---
+# The list_venues_* statements live in queries.py
+register_statement("insert_venue", f"""
+    INSERT INTO venues (name, building, room_number, google_maps_link)
+    VALUES ($1, $2, $3, $4)
+    RETURNING {VENUE_COLUMNS}
+""")
+
+register_statement("delete_venue", "DELETE FROM venues WHERE venue_id = $1")
+
+UPDATABLE_VENUE_FIELDS = ("name", "building", "room_number", "google_maps_link")
+UPDATABLE_VENUE_FIELD_SET = frozenset(UPDATABLE_VENUE_FIELDS)
+
+def _register_update_statements() -> Dict[frozenset, Tuple[str, Tuple[str, ...]]]:
+    """
+    Register one UPDATE per non-empty combination of fields (15).
+
+    Returns:
+        dict: Set of fields -> (statement name, the fields in parameter order).
+    """
+    statements = {}
+    for size in range(1, len(UPDATABLE_VENUE_FIELDS) + 1):
+        for keys in combinations(UPDATABLE_VENUE_FIELDS, size):
+            name = "update_venue_" + "_".join(keys)
+            assignments = ", ".join(f"{key} = ${i}" for i, key in enumerate(keys, 1))
+            # Only the changed columns come back
+            register_statement(name, f"UPDATE venues SET {assignments} WHERE venue_id = ${size + 1} "
+                                     f"RETURNING venue_id, {', '.join(keys)}")
+            statements[frozenset(keys)] = (name, keys)
+    return statements
+
+UPDATE_VENUE_STATEMENTS = _register_update_statements()
+
+
+def parse_venue_page_args() -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    """
+    Read list_venues pagination arguments from the query string.
+
+    Returns:
+        tuple: (after_name, after_id, limit). All None when the client did
+        not ask for pagination.
+
+    Raises:
+        ValueError: If an argument is malformed or the cursor is incomplete.
+    """
+    args = request.args
+    if ("after_name" in args) != ("after_id" in args):
+        raise ValueError("after_name and after_id must be given together")
+
+    after_id = int(args["after_id"]) if "after_id" in args else None
+    limit = min(max(int(args["limit"]), 1), MAX_VENUES_PAGE_SIZE) if "limit" in args else None
+    return args.get("after_name"), after_id, limit
+
+
+def vary_encoding(response: Response) -> Response:
+    """
+    Mark a list_venues response as depending on Accept-Encoding, since
+    cached bodies may be sent gzipped.
+    """
+    response.vary.add("Accept-Encoding")
+    return response
+
 
 @venues_bp.route("/", methods=["GET"])
 def list_venues() -> Tuple[Response, int]:
     """
-    Get all venues. 
+    Get all venues, ordered by name.
     
     Public access allowed (anyone can see venues).
+
+    Optional paging: ?limit=N, then ?after_name=&after_id= taken from the
+    last venue of the previous page.
+
+    Bodies are reused until a venue changes (gzipped once if the client accepts it),
+    and If-None-Match is answered with 304.
     
     Returns:
         200: List of venues.
+        304: Not modified since the client's ETag.
+        400: Invalid pagination parameters.
         500: Database error.
     """
-    sql = "SELECT * FROM venues ORDER BY name;"
+    try:
+        page = parse_venue_page_args()
+    except ValueError:
+        return json_response({"error": "Invalid pagination parameters"}), 400
+    after_name, after_id, limit = page
+
+    # Only the full list is cached: this route is public, and paging
+    # arguments from the query string would otherwise each get an entry
+    cacheable = page == (None, None, None)
+    version = get_data_version("venues")
+    etag = make_etag(version, *page)
+    if version is not None:
+        if request.if_none_match.contains_weak(etag):
+            return vary_encoding(not_modified(etag)), 304
+        entry = _venues_cache.get(None, version) if cacheable else None
+        if entry is not None:
+            body, compressed = entry
+            if request.accept_encodings["gzip"]:
+                if compressed is None:
+                    compressed = gzip_body(body)
+                    _venues_cache.set(None, version, (body, compressed))
+                response = gzip_json_response(compressed)
+            else:
+                response = raw_json_response(body)
+            return vary_encoding(with_etag(response, etag)), 200
+
+    if after_id is None:
+        statement, params = "list_venues_first", (limit,)
+    else:
+        statement, params = "list_venues_after", (after_name, after_id, limit)
+
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql)
-                venues = [dict(row) for row in cur.fetchall()]
-                return jsonify(venues), 200
-    except Exception as e:
-        print(f"Error listing venues: {e}")
-        return jsonify({"error": "Failed to list venues"}), 500
+                execute_prepared(cur, statement, params)
+                body = encode_json(cur.fetchall())
+    except Exception:
+        logger.exception("Failed to list venues")
+        return json_response({"error": "Failed to list venues"}), 500
+
+    response = raw_json_response(body)
+    if version is None:
+        return response, 200
+
+    if cacheable:
+        _venues_cache.set(None, version, (body, None))
+    return vary_encoding(with_etag(response, etag)), 200
 
 
 @venues_bp.route("/", methods=["POST"])
+@require_roles("admin")
 def create_venue() -> Tuple[Response, int]:
     """
     Admin-only: Create a new venue.
@@ -51,27 +177,17 @@ def create_venue() -> Tuple[Response, int]:
         403: Forbidden (not admin).
         500: Server error.
     """
-    _, _, err, code = verify_token_from_request(required_roles=["admin"])
-    if err:
-        return err, code
-
     data: Dict[str, Any] = request.get_json() or {}
     name = data.get("name")
     building = data.get("building")
     
     if not name or not building:
-        return jsonify({"error": "Name and Building are required"}), 400
+        return json_response({"error": "Name and Building are required"}), 400
 
-    sql = """
-        INSERT INTO venues (name, building, room_number, google_maps_link)
-        VALUES (%s, %s, %s, %s)
-        RETURNING venue_id;
-    """
-    
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, (
+                execute_prepared(cur, "insert_venue", (
                     name, 
                     building, 
                     data.get("room_number"), 
@@ -79,60 +195,53 @@ def create_venue() -> Tuple[Response, int]:
                 ))
                 venue = cur.fetchone()
                 conn.commit()
-                return jsonify(venue), 201
-    except Exception as e:
-        print(f"Error creating venue: {e}")
-        return jsonify({"error": "Failed to create venue"}), 500
+    except Exception:
+        logger.exception("Failed to create venue")
+        return json_response({"error": "Failed to create venue"}), 500
+
+    return json_response(venue), 201
 
 
 @venues_bp.route("/<int:venue_id>", methods=["PUT"])
+@require_roles("admin")
 def update_venue(venue_id: int) -> Tuple[Response, int]:
     """
     Admin-only: Update a venue.
     
     Returns:
-        200: Updated venue object.
+        200: venue_id plus the updated fields.
         400: No fields to update.
         403: Forbidden.
         404: Venue not found.
     """
-    _, _, err, code = verify_token_from_request(required_roles=["admin"])
-    if err:
-        return err, code
-
     data: Dict[str, Any] = request.get_json() or {}
     
-    # Simple dynamic update query builder
-    allowed_fields = ["name", "building", "room_number", "google_maps_link"]
-    fields = []
-    values = []
-    
-    for key in allowed_fields:
-        if key in data:
-            fields.append(f"{key} = %s")
-            values.append(data[key])
-            
+    # Scales with the request body, not with the number of updatable fields
+    fields = UPDATABLE_VENUE_FIELD_SET.intersection(data) if isinstance(data, dict) else None
     if not fields:
-        return jsonify({"error": "No valid fields to update"}), 400
+        return json_response({"error": "No valid fields to update"}), 400
         
+    statement, keys = UPDATE_VENUE_STATEMENTS[fields]
+    values = [data[key] for key in keys]
     values.append(venue_id)
-    sql = f"UPDATE venues SET {', '.join(fields)} WHERE venue_id = %s RETURNING *;"
 
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, values)
+                execute_prepared(cur, statement, values)
                 updated = cur.fetchone()
-                if not updated:
-                    return jsonify({"error": "Venue not found"}), 404
                 conn.commit()
-                return jsonify(dict(updated)), 200
-    except Exception as e:
-        print(f"Error updating venue: {e}")
-        return jsonify({"error": "Failed to update venue"}), 500
+    except Exception:
+        logger.exception("Failed to update venue %s", venue_id)
+        return json_response({"error": "Failed to update venue"}), 500
+
+    if not updated:
+        return json_response({"error": "Venue not found"}), 404
+    return json_response(updated), 200
 
 
 @venues_bp.route("/<int:venue_id>", methods=["DELETE"])
+@require_roles("admin")
 def delete_venue(venue_id: int) -> Tuple[Response, int]:
     """
     Admin-only: Delete a venue.
@@ -142,20 +251,18 @@ def delete_venue(venue_id: int) -> Tuple[Response, int]:
         403: Forbidden.
         404: Venue not found.
     """
-    _, _, err, code = verify_token_from_request(required_roles=["admin"])
-    if err:
-        return err, code
-
     try:
         with get_db() as conn:
             with conn.cursor() as cur:
                 # Check for usage (optional, but good practice)
                 # For now, relying on DB constraints (ON DELETE SET NULL in events table)
-                cur.execute("DELETE FROM venues WHERE venue_id = %s;", (venue_id,))
-                if cur.rowcount == 0:
-                     return jsonify({"error": "Venue not found"}), 404
+                execute_prepared(cur, "delete_venue", (venue_id,))
+                deleted = cur.rowcount
                 conn.commit()
-                return jsonify({"status": "deleted"}), 200
-    except Exception as e:
-        print(f"Error deleting venue: {e}")
-        return jsonify({"error": "Failed to delete venue"}), 500
\ No newline at end of file
+    except Exception:
+        logger.exception("Failed to delete venue %s", venue_id)
+        return json_response({"error": "Failed to delete venue"}), 500
+
+    if deleted == 0:
+        return json_response({"error": "Venue not found"}), 404
+    return raw_json_response(STATUS_DELETED), 200
\ No newline at end of file
@@ -34,6 +34,7 @@ export async function api(path, method = "GET", data = null, token = null) {
 
       console.warn("Session expired (401). Logging out...");
       localStorage.removeItem("token");
+      sessionStorage.removeItem("venues");
 
       // Redirect to login immediately
       window.location.hash = "#/login";
@@ -52,11 +53,40 @@ export async function api(path, method = "GET", data = null, token = null) {
       };
     }
 
-    // Success
+    // Success; 204 No Content has no body to parse
+    if (res.status === 204) return {};
     return await res.json();
 
   } catch (error) {
     console.error("API Network Error:", error);
     return { error: "Network error - check your connection", status: 0 };
   }
-}
\ No newline at end of file
+}
+
+// Venue list, revalidated with GET /venues/ on every call. A list saved by
+// saveVenues() (e.g. from the login response) is reused while the server
+// answers 304 Not Modified.
+export async function getVenues() {
+  const saved = JSON.parse(sessionStorage.getItem("venues") || "null");
+  const headers = {};
+  if (saved && saved.etag) headers["If-None-Match"] = saved.etag;
+
+  try {
+    const res = await fetch(API_BASE + "/venues/", { headers });
+    if (res.status === 304 && saved) return saved.list;
+    if (res.ok) {
+      const list = await res.json();
+      saveVenues(list, res.headers.get("ETag"));
+      return list;
+    }
+  } catch (error) {
+    console.error("Failed to load venues:", error);
+  }
+  // Server unreachable: an old list beats an empty picker
+  return saved ? saved.list : [];
+}
+
+// Remember a venue list and the ETag it was served with
+export function saveVenues(list, etag) {
+  sessionStorage.setItem("venues", JSON.stringify({ list, etag }));
+}
@@ -1,5 +1,5 @@
 // Cleaned up authentication and user management
-import { api } from "./api.js";
+import { api, saveVenues } from "./api.js";
 import { API_BASE } from "./config.js";
 
 export let token = localStorage.getItem("token") || null;
@@ -137,6 +137,9 @@ export async function handleLogin(email, password) {
     if (res.token) {
       localStorage.setItem("token", res.token);
       token = res.token;
+      if (res.venues) {
+        saveVenues(res.venues, res.venues_etag);
+      }
 
       // --- Role-based Redirect on Login ---
       const payload = decodeToken(res.token);
@@ -164,6 +167,7 @@ export async function handleLogin(email, password) {
 // Logout handler
 export function handleLogout() {
   localStorage.removeItem("token");
+  sessionStorage.removeItem("venues");
   token = null;
   window.location.hash = "#/landing"; // Redirect to landing page on logout
   // Force a reload to clear all state